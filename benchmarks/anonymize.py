@@ -0,0 +1,68 @@
+import argparse
+import hashlib
+import re
+import secrets
+from pathlib import Path
+
+from lxml import html as lxml_html
+
+# Что считается персональными данными на страницах 100points
+EMAIL = re.compile(r'[\w.+-]+@[\w-]+(?:\.[\w-]+)+')
+VK_ID = re.compile(r'(VK ID:\s*|vk\.com/id)(\d+)')
+PHONE = re.compile(r'\+?[78][\s(-]*\d{3}[\s)-]*\d{3}[\s-]*\d{2}[\s-]*\d{2}')
+TOKEN = re.compile(r'((?:name="_token"\s+value|name="csrf-token"\s+content)=")[^"]*(")')
+INLINE_SCRIPT = re.compile(r'(<script(?![^>]*\bsrc=)[^>]*>).*?(</script>)', re.S)
+NAME_INPUTS = "//div[contains(@class, 'card-body')]//input[contains(@class, 'form-control')]/@value"
+
+
+class Anonymizer:
+    # Одно и то же значение заменяется одинаково во всех файлах прогона,
+    # соль не дает восстановить исходное значение перебором
+    def __init__(self, salt: str = None, names=()):
+        self.salt = salt or secrets.token_hex(16)
+        self.names = set(names)
+
+    def _pseudonym(self, value: str) -> int:
+        return int(hashlib.sha1(f'{self.salt}:{value}'.encode('utf-8')).hexdigest()[:8], 16) % 100000
+
+    def collect_names(self, html: str):
+        try:
+            tree = lxml_html.fromstring(html)
+        except Exception:
+            return
+        self.names.update(value.strip() for value in tree.xpath(NAME_INPUTS) if value.strip())
+
+    def anonymize(self, html: str) -> str:
+        html = INLINE_SCRIPT.sub(r'\1\2', html)
+        html = TOKEN.sub(r'\1anonymized\2', html)
+        html = EMAIL.sub(lambda m: f'student{self._pseudonym(m.group().lower())}@example.com', html)
+        html = VK_ID.sub(lambda m: f'{m.group(1)}{500000000 + self._pseudonym(m.group(2))}', html)
+        html = PHONE.sub('+7 900 000-00-00', html)
+        # Длинные имена первыми, чтобы "Иван Петров" не заменился по частям
+        for name in sorted(self.names, key=len, reverse=True):
+            html = html.replace(name, f'Ученик {self._pseudonym(name)}')
+        return html
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Обезличивание сохраненных страниц 100points для корпуса фикстур')
+    parser.add_argument('pages', nargs='+', type=Path, help='Сохраненные HTML-страницы')
+    parser.add_argument('--out', type=Path, required=True, help='Папка для обезличенных страниц')
+    parser.add_argument('--salt', help='Соль псевдонимов, чтобы замены совпадали между запусками')
+    parser.add_argument('--name', action='append', default=[], help='Дополнительное имя для замены')
+    args = parser.parse_args()
+
+    anonymizer = Anonymizer(args.salt, args.name)
+    pages = [(path, path.read_text(encoding='utf-8')) for path in args.pages]
+    # Имена собираются со всех страниц заранее: на страницах списка они без разметки
+    for _, html in pages:
+        anonymizer.collect_names(html)
+
+    args.out.mkdir(parents=True, exist_ok=True)
+    for path, html in pages:
+        (args.out / path.name).write_text(anonymizer.anonymize(html), encoding='utf-8')
+        print(f'[INFO] {path} -> {args.out / path.name}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+from samples import homework_page  # samples настраивает sys.path
+from extractor import extract_homework
+from data_processing import build_tables
+from excel_writer import StreamingExcelWriter
+
+
+def records(count):
+    # Разбираем небольшой набор страниц и размножаем записи с уникальными href и учениками
+    base = [extract_homework(homework_page(i), '') for i in range(360)]
+    for number in range(count):
+        record = dict(base[number % len(base)])
+        record['href'] = f'https://api.100points.ru/student_homework/view/{number}?from=from_homework'
+        record['user_email'] = f'student{number // 30}@example.com'
+        record['user_name'] = f'Ученик {number // 30}'
+        record['vk_id'] = str(500000000 + number // 30)
+        yield record
+
+
+def save_to_excel(df, table, path):
+    # Прежний путь через pandas.ExcelWriter
+    with pd.ExcelWriter(path) as writer:
+        table.to_excel(writer, sheet_name='Result')
+        df.to_excel(writer, sheet_name='Data')
+
+
+def save_streaming(df, table, path):
+    with StreamingExcelWriter(path) as writer:
+        writer.write_frame(table, sheet_name='Result')
+        writer.write_frame(df, sheet_name='Data')
+
+
+def measure(save_func, df, table, path):
+    # Время и пик памяти меряются отдельными прогонами: tracemalloc сильно замедляет запись
+    start = time.perf_counter()
+    save_func(df, table, path)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    save_func(df, table, path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description='DataFrame.to_excel против потоковой записи write_only')
+    parser.add_argument('--rows', type=int, nargs='+', default=[5000, 20000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in args.rows:
+            df, table = build_tables(list(records(rows)))
+            for name, save_func in (('to_excel', save_to_excel), ('streaming', save_streaming)):
+                path = os.path.join(directory, f'{name}.xlsx')
+                elapsed, peak = measure(save_func, df, table, path)
+                print(f'{rows:>8} rows  {name:<10} {elapsed:7.2f} s  peak {peak / 2 ** 20:7.1f} MiB  '
+                      f'{os.path.getsize(path) / 2 ** 20:5.1f} MiB on disk')
+
+
+if __name__ == '__main__':
+    main()
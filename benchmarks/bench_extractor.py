@@ -0,0 +1,40 @@
+import argparse
+import time
+
+from samples import homework_page  # samples настраивает sys.path
+from parsers import parse_homework_page_soup
+from extractor import extract_homework
+
+
+def bench(parse_func, pages, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for url, html in pages:
+            parse_func(html, url)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='BeautifulSoup vs lxml/XPath на страницах домашних заданий')
+    parser.add_argument('--pages', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    pages = [(f'https://api.100points.ru/student_homework/view/{i}', homework_page(i)) for i in range(args.pages)]
+
+    for url, html in pages[:50]:
+        if parse_homework_page_soup(html, url) != extract_homework(html, url):
+            raise SystemExit(f'[ERROR] records differ for {url}')
+
+    soup_time = bench(parse_homework_page_soup, pages, args.repeat)
+    lxml_time = bench(extract_homework, pages, args.repeat)
+    print(f'BeautifulSoup : {soup_time:.3f} s, {soup_time / args.pages * 1000:.3f} ms/page')
+    print(f'lxml/XPath    : {lxml_time:.3f} s, {lxml_time / args.pages * 1000:.3f} ms/page')
+    print(f'speedup       : x{soup_time / lxml_time:.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+import argparse
+import asyncio
+import contextlib
+import contextvars
+import io
+import multiprocessing
+import os
+import socket
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import fake_server  # fake_server импортирует samples, который настраивает sys.path
+from web_scraper import WebScraper
+
+
+# Момент вызова _request_html: запросы идут параллельно в разных задачах, у каждой свое значение
+_queued = contextvars.ContextVar('queued')
+
+
+class TimedScraper(WebScraper):
+    # Задержка -- время запроса внутри слота ограничителя; ожидание слота и rate limit считается отдельно,
+    # иначе очередь к ограничителю выглядит как медленный сервер
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.latencies = []
+        self.queue_waits = []
+        self._limiter_slot = self.limiter.slot
+        self.limiter.slot = self._timed_slot
+
+    async def _request_html(self, url, params=None):
+        _queued.set(time.perf_counter())
+        return await super()._request_html(url, params)
+
+    @contextlib.asynccontextmanager
+    async def _timed_slot(self):
+        queued = _queued.get()
+        async with self._limiter_slot():
+            acquired = time.perf_counter()
+            self.queue_waits.append(acquired - queued)
+            try:
+                yield
+            finally:
+                self.latencies.append(time.perf_counter() - acquired)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('localhost', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port: int, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('localhost', port), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f'fake server did not start on port {port}')
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def peak_rss_mib():
+    # ru_maxrss: килобайты в Linux, байты в macOS
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+
+async def scrape(base_url, args):
+    config = SimpleNamespace(email='load@example.com', password='secret', course_id=1, group_id=1,
+                             show_homeworks_in_the_terminal=False)
+    scraper = TimedScraper(config, connections_limit=args.connections, use_parse_executor=args.parse_executor,
+                           use_cache=False, rate_limits={}, journal_path=None, base_url=base_url,
+                           collect_metrics=args.metrics is not None)
+    scraper.show_progress = False
+    # Пустой ввод на оба фильтра: все модули и все уроки
+    sys.stdin = io.StringIO('\n\n')
+    output = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(sys.stdout if args.verbose else output):
+        await scraper.run_scraping()
+    return scraper, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Нагрузочный тест WebScraper.run_scraping на фейковом сервере')
+    parser.add_argument('--records', type=int, default=2000)
+    parser.add_argument('--latency', type=float, default=20, help='Средняя задержка ответа сервера, мс')
+    parser.add_argument('--jitter', type=float, default=10, help='Разброс задержки, мс')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Доля ответов 503')
+    parser.add_argument('--session-ttl', type=float, default=None,
+                        help='Сессия на сервере истекает через N секунд после входа (проверка повторной авторизации)')
+    parser.add_argument('--connections', type=int, default=50)
+    parser.add_argument('--parse-executor', action='store_true', help='Разбор HTML в пуле процессов')
+    parser.add_argument('--metrics', type=os.path.abspath, metavar='PATH',
+                        help='Сохранить метрики запросов в PATH.json и PATH.prom')
+    parser.add_argument('--verbose', action='store_true', help='Показывать вывод скрепера')
+    args = parser.parse_args()
+
+    port = free_port()
+    # Сервер в отдельном процессе, чтобы не делить с клиентом event loop и память
+    server = multiprocessing.Process(target=fake_server.serve, daemon=True, kwargs=dict(
+        port=port, records=args.records, latency=args.latency / 1000, jitter=args.jitter / 1000,
+        error_rate=args.error_rate, session_ttl=args.session_ttl))
+    server.start()
+    cwd = os.getcwd()
+    try:
+        wait_for_port(port)
+        with tempfile.TemporaryDirectory() as directory:
+            # Файл cookies скрепер пишет в текущую папку
+            os.chdir(directory)
+            scraper, elapsed = asyncio.run(scrape(f'http://localhost:{port}', args))
+            os.chdir(cwd)
+    finally:
+        os.chdir(cwd)
+        server.terminate()
+        server.join()
+
+    records = len(scraper.data)
+    rss = peak_rss_mib()
+    print(f'records    {records} / {args.records}')
+    print(f'elapsed    {elapsed:.2f} s, {records / elapsed:.1f} records/s')
+    print(f'requests   {len(scraper.latencies)}, in slot p50 {percentile(scraper.latencies, 0.5) * 1000:.1f} ms, '
+          f'p99 {percentile(scraper.latencies, 0.99) * 1000:.1f} ms')
+    print(f'queue wait p50 {percentile(scraper.queue_waits, 0.5) * 1000:.1f} ms, '
+          f'p99 {percentile(scraper.queue_waits, 0.99) * 1000:.1f} ms')
+    print(f'limiter    {scraper.limiter.limit} (max {args.connections}), overload errors {scraper.limiter.errors}')
+    print(f'retries    {scraper.retry_policy.retries}, failed urls {len(scraper.retry_policy.failed_urls)}')
+    print(f'peak RSS   {"n/a" if rss is None else f"{rss:.1f} MiB"}')
+    if args.metrics:
+        scraper.save_metrics(args.metrics)
+
+
+if __name__ == '__main__':
+    main()
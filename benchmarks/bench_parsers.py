@@ -0,0 +1,134 @@
+import argparse
+import itertools
+import json
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import samples  # samples настраивает sys.path
+from parsers import parse_homework_page, parse_page_rows
+
+FIXTURES = Path(__file__).resolve().parent / 'fixtures'
+EXPECTED = FIXTURES / 'expected.json'
+HISTORY = Path(__file__).resolve().parent / 'results' / 'bench_parsers.jsonl'
+
+
+def load_corpus():
+    detail = [(path.name, path.read_text(encoding='utf-8')) for path in sorted((FIXTURES / 'detail').glob('*.html'))]
+    listing = [(path.name, path.read_text(encoding='utf-8')) for path in sorted((FIXTURES / 'listing').glob('*.html'))]
+    return detail, listing
+
+
+def parse_corpus(detail, listing):
+    return {
+        'detail': {name: parse_homework_page(html, name) for name, html in detail},
+        'listing': {name: [list(row) for row in parse_page_rows(html)] for name, html in listing},
+    }
+
+
+def best_time(func, pages, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for name, html in pages:
+            func(html, name)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def measure(detail, listing, repeat):
+    parse_rows = lambda html, name: parse_page_rows(html)
+    results = {}
+    for name, html in detail:
+        results[f'detail/{name} ms/page'] = best_time(parse_homework_page, [(name, html)] * 50, repeat) / 50 * 1000
+    for name, html in listing:
+        results[f'listing/{name} ms/page'] = best_time(parse_rows, [(name, html)] * 50, repeat) / 50 * 1000
+    # 1000 страниц корпуса подряд: так видно и влияние кэшей, и накладные расходы на страницу
+    results['detail x1000 s'] = best_time(parse_homework_page, list(itertools.islice(itertools.cycle(detail), 1000)),
+                                          repeat)
+    results['listing x1000 s'] = best_time(parse_rows, list(itertools.islice(itertools.cycle(listing), 1000)), repeat)
+    return results
+
+
+def git_revision():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                check=True, cwd=FIXTURES).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], capture_output=True,
+                                    text=True, cwd=FIXTURES).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown', False
+    return commit, dirty
+
+
+def load_history():
+    if not HISTORY.exists():
+        return []
+    with HISTORY.open(encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def find_baseline(history, commit, revision=None):
+    # По умолчанию сравниваем с последним замером другого коммита
+    for entry in reversed(history):
+        if revision is not None:
+            if entry['commit'].startswith(revision):
+                return entry
+        elif entry['commit'] != commit:
+            return entry
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Скорость разбора корпуса страниц 100points и контроль регрессий')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--threshold', type=float, default=0.2, help='Допустимое замедление, доля (0.2 = 20%%)')
+    parser.add_argument('--baseline', help='Коммит для сравнения (по умолчанию предыдущий замер)')
+    parser.add_argument('--no-record', action='store_true', help='Не сохранять замер в истории')
+    parser.add_argument('--update-expected', action='store_true', help='Перезаписать эталонный результат разбора')
+    args = parser.parse_args()
+
+    detail, listing = load_corpus()
+    parsed = parse_corpus(detail, listing)
+    if args.update_expected:
+        EXPECTED.write_text(json.dumps(parsed, ensure_ascii=False, indent=1) + '\n', encoding='utf-8')
+        print(f'[INFO] Эталон сохранен в {EXPECTED}')
+    elif parsed != json.loads(EXPECTED.read_text(encoding='utf-8')):
+        sys.exit(f'[ERROR] Результат разбора отличается от {EXPECTED}')
+
+    commit, dirty = git_revision()
+    results = measure(detail, listing, args.repeat)
+    baseline = find_baseline(load_history(), commit, args.baseline)
+
+    regressions = []
+    print(f'{"":<40} {"now":>9} {"baseline":>9}')
+    for name, value in results.items():
+        before = baseline['results'].get(name) if baseline else None
+        line = f'{name:<40} {value:9.3f}'
+        if before:
+            change = value / before - 1
+            line += f' {before:9.3f} {change:+7.1%}'
+            if change > args.threshold:
+                regressions.append(name)
+                line += '  REGRESSION'
+        print(line)
+    if baseline:
+        print(f'[INFO] База: {baseline["commit"]} от {baseline["date"]}')
+
+    if not args.no_record:
+        HISTORY.parent.mkdir(exist_ok=True)
+        entry = {'commit': commit, 'dirty': dirty, 'date': datetime.now().isoformat(timespec='seconds'),
+                 'python': platform.python_version(), 'results': results}
+        with HISTORY.open('a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + '\n')
+
+    if regressions:
+        sys.exit(f'[ERROR] Замедление больше {args.threshold:.0%}: {", ".join(regressions)}')
+
+
+if __name__ == '__main__':
+    main()
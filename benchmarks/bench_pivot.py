@@ -0,0 +1,63 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import samples  # noqa: F401  (настраивает sys.path)
+from data_processing import pivot_max_by_level
+from records import LEVELS as LEVEL_NAMES
+
+LEVELS = pd.CategoricalDtype(categories=LEVEL_NAMES, ordered=True)
+
+
+def synthetic_frame(rows, seed=0):
+    # Каждый ученик сдает несколько уроков, по уроку -- до трех уровней, иногда по нескольку попыток
+    rng = np.random.default_rng(seed)
+    students = max(rows // 30, 1)
+    lessons = max(rows // 500, 1)
+    student = rng.integers(0, students, rows)
+    lesson = rng.integers(0, lessons, rows)
+    return pd.DataFrame({
+        'href': [f'https://api.100points.ru/student_homework/view/{number}' for number in rng.permutation(rows)],
+        'user_email': pd.Series(student).map(lambda number: f'student{number}@example.com'),
+        'user_name': pd.Series(student).map(lambda number: f'Ученик {number}'),
+        'vk_id': 500000000 + student,
+        'course': 'Годовой курс «Flash 2023/2024»',
+        'module': pd.Series(lesson // 10).map(lambda number: f'{number} блок'),
+        'lesson': pd.Series(lesson).map(lambda number: f'Урок №{number}'),
+        'level': pd.Categorical.from_codes(rng.integers(0, 3, rows), dtype=LEVELS),
+        'test_score': rng.integers(0, 13, rows),
+    })
+
+
+def pivot_table(df):
+    # Прежняя реализация из process_and_save_data
+    return pd.pivot_table(df, values=['test_score', 'href'],
+                          index=['user_email', 'user_name', 'vk_id', 'course', 'module', 'lesson'],
+                          columns=['level'], aggfunc='max', fill_value=' ', observed=False).reset_index()
+
+
+def timed(func, df):
+    start = time.perf_counter()
+    table = func(df)
+    table = table.sort_values(by=['course', 'module', 'lesson'], ascending=False, ignore_index=True)
+    return table, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='pivot_table против pivot_max_by_level')
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        df = synthetic_frame(rows)
+        expected, pivot_time = timed(pivot_table, df)
+        result, vectorized_time = timed(pivot_max_by_level, df)
+        pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+        print(f'{rows:>9} rows  pivot_table {pivot_time:7.2f} s  vectorized {vectorized_time:7.2f} s  '
+              f'x{pivot_time / vectorized_time:.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+import argparse
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PACKAGE = Path(__file__).resolve().parent.parent / 'src' / 'scraper_api_100points'
+
+# Эти модули не должны загружаться до начала сбора
+HEAVY_MODULES = ('pandas', 'numpy', 'openpyxl', 'pyarrow', 'prettytable')
+
+IMPORT_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def import_times(args):
+    # -X importtime пишет в stderr: собственное и накопленное время импорта каждого модуля, мкс
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', *args], cwd=PACKAGE,
+                            capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    modules = {}
+    for match in IMPORT_LINE.finditer(result.stderr):
+        own, cumulative, indent, name = match.groups()
+        modules[name] = (int(own), int(cumulative), len(indent) // 2)
+    return elapsed, modules
+
+
+def top_level_ms(modules) -> float:
+    return sum(cumulative for _, cumulative, level in modules.values() if level == 0) / 1000
+
+
+def measure(args, repeat):
+    # Лучший из нескольких запусков: первый обычно медленнее из-за холодного дискового кэша
+    runs = [import_times(args) for _ in range(repeat)]
+    return min(runs, key=lambda run: top_level_ms(run[1]))
+
+
+def check(name, args, budget_ms, baseline_ms, repeat, show):
+    elapsed, modules = measure(args, repeat)
+    imports_ms = top_level_ms(modules) - baseline_ms
+    heavy = sorted({module.split('.')[0] for module in modules} & set(HEAVY_MODULES))
+
+    print(f'{name:<22} imports {imports_ms:7.1f} ms (budget {budget_ms:.0f} ms), wall {elapsed * 1000:7.1f} ms')
+    errors = []
+    if imports_ms > budget_ms:
+        errors.append(f'{name}: импорт {imports_ms:.0f} ms больше бюджета {budget_ms:.0f} ms')
+    if heavy:
+        errors.append(f'{name}: загружены тяжелые модули {", ".join(heavy)}')
+    if errors or show:
+        slowest = sorted(((cumulative, module) for module, (_, cumulative, level) in modules.items() if level <= 1),
+                         reverse=True)[:show or 10]
+        for cumulative, module in slowest:
+            print(f'    {cumulative / 1000:7.1f} ms  {module}')
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Проверка бюджета времени запуска по python -X importtime')
+    parser.add_argument('--help-budget', type=float, default=100, help='Бюджет импорта для --help, мс')
+    parser.add_argument('--scrape-budget', type=float, default=600,
+                        help='Бюджет импорта до начала сбора (web_scraper), мс')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--show', type=int, default=0, help='Показать N самых медленных импортов')
+    args = parser.parse_args()
+
+    # Импорты самого интерпретатора (site, encodings) не относятся к скреперу
+    _, interpreter = measure(['-c', 'pass'], args.repeat)
+    baseline_ms = top_level_ms(interpreter)
+    print(f'{"interpreter":<22} imports {baseline_ms:7.1f} ms')
+
+    errors = check('__main__.py --help', ['__main__.py', '--help'], args.help_budget, baseline_ms,
+                   args.repeat, args.show)
+    errors += check('import web_scraper', ['-c', 'import web_scraper'], args.scrape_budget, baseline_ms,
+                    args.repeat, args.show)
+
+    if errors:
+        sys.exit('[ERROR] ' + '\n[ERROR] '.join(errors))
+
+
+if __name__ == '__main__':
+    main()
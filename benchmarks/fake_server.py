@@ -0,0 +1,118 @@
+import argparse
+import asyncio
+import random
+import secrets
+import time
+
+from aiohttp import web
+
+from samples import homework_page, listing_page, login_page
+
+SESSION_COOKIE = 'fake_session'
+TOKEN = 'fake-csrf-token'
+
+
+class FakeServer:
+    # Локальная имитация 100points: логин, /myself, список и страницы домашних заданий
+    def __init__(self, records: int = 1000, latency: float = 0.02, jitter: float = 0.01,
+                 error_rate: float = 0.0, per_page: int = 15, seed: int = 0, session_ttl: float = None):
+        self.records = records
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.per_page = per_page
+        self.random = random.Random(seed)
+        # Сессия истекает через session_ttl секунд после входа, дальше запросы уходят на /login
+        self.session_ttl = session_ttl
+        self.sessions = {}
+        self.logins = 0
+        self.requests = 0
+        self.errors = 0
+
+    async def _delay(self):
+        self.requests += 1
+        await asyncio.sleep(max(0.0, self.random.gauss(self.latency, self.jitter)))
+        if self.random.random() < self.error_rate:
+            self.errors += 1
+            raise web.HTTPServiceUnavailable()
+
+    def _check_session(self, request):
+        issued = self.sessions.get(request.cookies.get(SESSION_COOKIE))
+        if issued is None or (self.session_ttl is not None and time.monotonic() - issued > self.session_ttl):
+            raise web.HTTPFound('/login')
+
+    def _base_url(self, request):
+        return f'{request.scheme}://{request.host}'
+
+    async def login_form(self, request):
+        return web.Response(text=login_page(TOKEN), content_type='text/html')
+
+    async def login(self, request):
+        form = await request.post()
+        if form.get('_token') != TOKEN or not form.get('email'):
+            raise web.HTTPFound('/login')
+        self.logins += 1
+        token = secrets.token_hex(16)
+        self.sessions[token] = time.monotonic()
+        response = web.HTTPFound('/')
+        response.set_cookie(SESSION_COOKIE, token)
+        raise response
+
+    async def home(self, request):
+        self._check_session(request)
+        return web.Response(text='<html><body>ok</body></html>', content_type='text/html')
+
+    async def myself(self, request):
+        self._check_session(request)
+        return web.json_response({'logins': self.logins})
+
+    async def index(self, request):
+        self._check_session(request)
+        await self._delay()
+        page = int(request.query.get('page', 1))
+        html = listing_page(page, self.records, self._base_url(request), per_page=self.per_page)
+        return web.Response(text=html, content_type='text/html')
+
+    async def view(self, request):
+        self._check_session(request)
+        await self._delay()
+        number = int(request.match_info['number'])
+        if number >= self.records:
+            raise web.HTTPNotFound()
+        return web.Response(text=homework_page(number, self._base_url(request)), content_type='text/html')
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.add_routes([
+            web.get('/', self.home),
+            web.get('/login', self.login_form),
+            web.post('/login', self.login),
+            web.get('/myself', self.myself),
+            web.get('/student_homework/index', self.index),
+            web.get('/student_homework/view/{number}', self.view),
+        ])
+        return app
+
+
+def serve(host: str = 'localhost', port: int = 8765, **options):
+    web.run_app(FakeServer(**options).make_app(), host=host, port=port, print=None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Локальный фейковый сервер 100points для нагрузочных тестов')
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--records', type=int, default=1000, help='Количество домашних заданий')
+    parser.add_argument('--latency', type=float, default=20, help='Средняя задержка ответа, мс')
+    parser.add_argument('--jitter', type=float, default=10, help='Разброс задержки, мс')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Доля ответов 503')
+    parser.add_argument('--session-ttl', type=float, default=None, help='Время жизни сессии после входа, с')
+    args = parser.parse_args()
+
+    print(f'Fake 100points: http://{args.host}:{args.port}')
+    serve(args.host, args.port, records=args.records, latency=args.latency / 1000,
+          jitter=args.jitter / 1000, error_rate=args.error_rate, session_ttl=args.session_ttl)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+import sys
+from pathlib import Path
+
+# Бенчмарки запускаются из корня репозитория, модули скрепера импортируются как в __main__.py
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src' / 'scraper_api_100points'))
+
+from records import LEVELS  # noqa: E402
+
+
+def homework_page(number: int, base_url: str = 'https://api.100points.ru') -> str:
+    student = number % 40
+    return f'''<html><head><title>Домашнее задание</title></head><body>
+<nav class="navbar"><a href="{base_url}/student_homework/index">Домашние задания</a></nav>
+<div class="card card-primary"><div class="card-body"><div class="row">
+<div class="form-group col-md-3"><label>Ученик</label>
+<div>student{student}@example.com</div>
+<input type="text" class="form-control" value="Ученик {student}" disabled>
+<div>VK ID: {500000000 + student}</div></div>
+<div class="form-group col-md-3"><div>Урок: Урок №{number // 120}. Тема {number // 120}</div>
+<div>Модуль: {number // 600 + 1} блок</div><div>Курс: Годовой курс «Flash 2023/2024»</div>
+<div>Сложность: {LEVELS[number % 3]}</div></div>
+<div class="form-group col-md-3"><label>Статус</label> Одобрено</div>
+<div class="form-group col-md-3"><div>Сдано: 25.02.2024 11:11:19</div><div>Проверено</div>
+<div>Дедлайн: 2024-02-24 23:59:00</div></div>
+<div class="form-group col-md-3"><div>Баллы за тест: {number % 13}</div><div>Вторичные баллы: 0</div>
+<div>Баллы куратора: 0</div></div>
+<div class="form-group col-md-3"><div>Итог: {number % 13 * 100 // 12}% {number % 13}/12</div></div>
+</div></div></div></body></html>'''
+
+
+def listing_page(page: int, total: int, base_url: str = 'https://api.100points.ru', per_page: int = 15,
+                 modules: int = 3, lessons: int = 12) -> str:
+    # Страница списка: фильтры модуля и урока, строки таблицы и счетчик записей
+    start = (page - 1) * per_page
+    rows = ''.join(f'<tr class="odd"><td>{number}</td><td>student{number % 40}@example.com</td>'
+                   f'<td><a href="{base_url}/student_homework/view/{number}?from=from_homework">Открыть</a></td></tr>'
+                   for number in range(start, min(start + per_page, total)))
+    module_options = ''.join(f'<option value="{module}">{module} блок</option>' for module in range(1, modules + 1))
+    lesson_options = ''.join(f'<option value="{lesson}">Урок №{lesson}</option>' for lesson in range(1, lessons + 1))
+    return f'''<html><head><title>Домашние задания</title></head><body>
+<form><select class="form-control" id="module_id"><option value="">Все модули</option>{module_options}</select>
+<select class="form-control" id="lesson_id"><option value="">Все уроки</option>{lesson_options}</select></form>
+<div id="example2_wrapper"><table><tbody>{rows}</tbody></table>
+<div id="example2_info">Записи с {start + 1} до {min(start + per_page, total)} из {total}</div></div>
+</body></html>'''
+
+
+def login_page(token: str) -> str:
+    return f'''<html><body><form method="post" action="/login">
+<input type="hidden" name="_token" value="{token}">
+<input type="email" name="email"><input type="password" name="password"></form></body></html>'''
@@ -1,26 +1,135 @@
+import argparse
 import asyncio
 import datetime
+import sys
 import time
 from pathlib import Path
-import web_scraper
-from config import AppConfig, AppConfig_test
-from data_processing import *
-import openpyxl
+from config import AppConfig, AppConfig_test, parse_groups, parse_selections
+from profiling import StageProfiler
+
+# aiohttp, pandas, numpy и openpyxl импортируются там, где нужны: --help и ошибки аргументов
+# не ждут их загрузки, а pandas/openpyxl грузятся только после сбора.
+# Бюджет запуска проверяется benchmarks/check_startup.py
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Сбор домашних заданий с 100points.ru')
+    parser.add_argument('--no-cache', action='store_true', help='не использовать кэш страниц списка и фильтров')
+    parser.add_argument('--resume', action='store_true', help='продолжить прерванный прогон по журналу')
+    parser.add_argument('--batch', nargs='?', const='', metavar='SELECTIONS',
+                        help='пакетный режим без вопросов: "12:34, 12:*, 15" (модуль:урок, * -- каждый урок модуля, '
+                             'без урока -- весь модуль); без значения берется [batch] selections из конфига')
+    parser.add_argument('--groups', nargs='?', const='', metavar='GROUPS',
+                        help='собрать несколько групп в параллельных процессах: "1840:12, 1840:13" (курс:группа); '
+                             'без значения берется [main] groups из конфига. Выборки задаются через --batch')
+    parser.add_argument('--workers', type=int, default=None, help='число процессов для --groups (по умолчанию -- число ядер)')
+    parser.add_argument('--parse-workers', type=int, default=None, metavar='N',
+                        help='разбирать страницы в пуле из N процессов (0 -- в основном процессе); '
+                             'по умолчанию [setting] parse_workers из конфига')
+    parser.add_argument('--queue-size', type=int, default=None, metavar='N',
+                        help='глубина очереди ссылок между страницами списка и загрузкой заданий; '
+                             'по умолчанию [setting] queue_size из конфига (200)')
+    parser.add_argument('--format', choices=['xlsx', 'parquet', 'arrow'], default='xlsx',
+                        help='формат сохранения: xlsx или колоночный parquet/arrow (нужен pyarrow)')
+    parser.add_argument('--excel-view', action='store_true', help='для parquet/arrow дополнительно построить xlsx')
+    parser.add_argument('--analytics', action='store_true',
+                        help='добавить аналитику: выполнение по ученикам и урокам, опоздания, процентили баллов')
+    parser.add_argument('--combined', action='store_true', help='в пакетном режиме сохранить все выборки в один файл')
+    parser.add_argument('--metrics', action='store_true',
+                        help='сохранить метрики запросов в excel_output/metrics--<время>.json и .prom')
+    parser.add_argument('--daemon', action='store_true',
+                        help='режим демона: сбор по расписанию ([daemon] interval, мин) и локальный HTTP API '
+                             '(/status, /records, /pivot, /refresh, /metrics); выборки -- из --batch или конфига')
+    parser.add_argument('--profile', action='store_true',
+                        help='профиль cProfile и tracemalloc по этапам (auth, filters, details или scraping для --batch, '
+                             'processing, export) в excel_output/profile--<время>/')
+    args = parser.parse_args()
+    # Журнал ведется только при обычном сборе: пакетный режим, группы и демон его не открывают
+    if args.resume and (args.batch is not None or args.groups is not None or args.daemon):
+        parser.error('--resume нельзя совмещать с --batch, --groups и --daemon')
+    if args.queue_size is not None and args.queue_size < 1:
+        parser.error('--queue-size должен быть не меньше 1')
+    return args
+
+
+def save_data(data, csv_filename, args, profiler):
+    from data_processing import process_and_save_data
+
+    process_and_save_data(data, csv_filename, args.format, args.excel_view, args.analytics, profiler)
+
 
 async def main():
+    args = parse_args()
+    import web_scraper
+
     print('hello')
     start = time.time()
 
     config = AppConfig_test('scraper.ini')
 
-    test = web_scraper.WebScraper(config, connections_limit=50)
-    await test.run_scraping()
-    data = await test.get_data()
-
     current_time = datetime.datetime.now().strftime("%d_%m_%Y_%H_%M")
-    csv_filename = f'{await test.get_module()}--{await test.get_lesson()}--{current_time}.xlsx'
+    profiler = StageProfiler(Path('excel_output') / f'profile--{current_time}' if args.profile else None)
+    parse_workers = config.parse_workers if args.parse_workers is None else args.parse_workers
+    queue_size = config.queue_size if args.queue_size is None else args.queue_size
+    if queue_size < 1:
+        print('[ERROR] [setting] queue_size должен быть не меньше 1')
+        sys.exit(1)
+
+    test = web_scraper.WebScraper(config, connections_limit=50, queue_size=queue_size, incremental=config.incremental,
+                                  use_parse_executor=parse_workers > 0, parse_workers=parse_workers or None,
+                                  use_cache=not args.no_cache, rate_limits=config.rate_limits,
+                                  resume=args.resume, collect_metrics=args.metrics, profiler=profiler)
+
+    if args.daemon:
+        from daemon import ScrapeDaemon
+
+        selections = parse_selections(args.batch) if args.batch else config.batch_selections
+        test.show_progress = False
+        daemon = ScrapeDaemon(test, selections, interval=config.daemon_interval * 60,
+                              host=config.daemon_host, port=config.daemon_port)
+        await daemon.run()
+        return
+    elif args.groups is not None:
+        groups = parse_groups(args.groups) if args.groups else config.groups
+        if not groups:
+            print('[ERROR] Группы не заданы: укажите --groups "курс:группа, ..." или [main] groups в конфиге')
+            sys.exit(1)
+        selections = parse_selections(args.batch) if args.batch else config.batch_selections
+        if args.profile:
+            print('[WARNING] сбор для --groups идет в других процессах, в профиль попадут только обработка и экспорт')
+        from sharding import run_sharded
+
+        data = await run_sharded('scraper.ini', groups, selections, workers=args.workers,
+                                 rate_limits=config.rate_limits, use_cache=not args.no_cache,
+                                 parse_workers=parse_workers, queue_size=queue_size)
+        save_data(data, f'groups--{current_time}.xlsx', args, profiler)
+    elif args.batch is not None:
+        selections = parse_selections(args.batch) if args.batch else config.batch_selections
+        if not selections:
+            print('[ERROR] Выборки не заданы: укажите --batch "модуль:урок, ..." или [batch] selections в конфиге')
+            sys.exit(1)
+        scrapers = await test.run_batch(selections)
+        if args.combined:
+            save_data(await test.get_data(), f'batch--{current_time}.xlsx', args, profiler)
+        else:
+            for scraper in scrapers:
+                csv_filename = f'{await scraper.get_module()}--{await scraper.get_lesson()}--{current_time}.xlsx'
+                save_data(await scraper.get_data(), csv_filename, args, profiler)
+    else:
+        await test.run_scraping()
+        data = await test.get_data()
+
+        csv_filename = f'{await test.get_module()}--{await test.get_lesson()}--{current_time}.xlsx'
+
+        save_data(data, csv_filename, args, profiler)
+
+    if args.metrics:
+        if args.groups is not None:
+            print('[WARNING] метрики для --groups не собираются: запросы выполняются в других процессах')
+        else:
+            test.save_metrics(Path('excel_output') / f'metrics--{current_time}')
 
-    process_and_save_data(data, csv_filename)
+    profiler.finish()
 
     end = time.time()
     print("[TIME]The time of execution of above program is :",
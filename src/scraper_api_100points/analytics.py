@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+from records import FIELD_TIME_FORMATS, LEVELS
+
+LATENESS_BINS = [-np.inf, 0, 1, 24, 72, 168, np.inf]
+LATENESS_LABELS = ['вовремя', 'до 1 ч', '1-24 ч', '1-3 дня', '3-7 дней', 'больше недели']
+SCORE_COLUMNS = ['test_score', 'secondary_score', 'curator_score', 'result_percent']
+PERCENTILES = [0.1, 0.25, 0.5, 0.75, 0.9]
+STUDENT = ['user_email', 'user_name']
+# Урок определяется вместе с курсом и модулем: уроки с одинаковым названием бывают в разных модулях
+LESSON = ['course', 'module', 'lesson']
+
+
+def _prepare(df):
+    frame = df.copy()
+    # Фиксированные форматы дат со страниц 100points: без угадывания формата на каждую строку
+    for column, time_format in FIELD_TIME_FORMATS.items():
+        if not pd.api.types.is_datetime64_any_dtype(frame[column]):
+            frame[column] = pd.to_datetime(frame[column], format=time_format, errors='coerce')
+    for column in SCORE_COLUMNS[:-1]:
+        frame[column] = pd.to_numeric(frame[column], errors='coerce')
+    frame['result_percent'] = pd.to_numeric(frame['result_score'].astype('string').str.extract(r'(\d+)%', expand=False),
+                                            errors='coerce')
+    frame['level'] = frame['level'].astype(pd.CategoricalDtype(LEVELS, ordered=True))
+    frame['lateness_hours'] = (frame['submission_time'] - frame['deadline_time']).dt.total_seconds() / 3600
+    return frame
+
+
+def _completion(frame, by, total):
+    # Доля сданных (урок, уровень) или (ученик, уровень) от всех возможных, отдельно по уровням и в сумме
+    done = frame.drop_duplicates(subset=list(dict.fromkeys(by + LESSON + ['user_email', 'level'])))
+    counts = pd.crosstab([done[column] for column in by], done['level'])
+    counts = counts.reindex(columns=list(LEVELS), fill_value=0)
+    rates = counts / max(total, 1)
+    rates.columns = list(LEVELS)
+    rates['все уровни'] = counts.sum(axis=1) / max(total * len(LEVELS), 1)
+    return rates.reset_index()
+
+
+def completion_by_student(frame):
+    return _completion(frame, STUDENT, len(frame[LESSON].drop_duplicates()))
+
+
+def completion_by_lesson(frame):
+    return _completion(frame, LESSON, frame['user_email'].nunique())
+
+
+def lateness_distribution(frame):
+    buckets = pd.cut(frame['lateness_hours'], LATENESS_BINS, labels=LATENESS_LABELS)
+    distribution = pd.crosstab([frame[column] for column in LESSON], buckets)
+    distribution = distribution.reindex(columns=LATENESS_LABELS, fill_value=0)
+    distribution.columns = list(LATENESS_LABELS)
+    late = frame['lateness_hours'].where(frame['lateness_hours'] > 0)
+    grouped = late.groupby([frame[column] for column in LESSON])
+    distribution['медиана опоздания, ч'] = grouped.median()
+    distribution['макс. опоздание, ч'] = grouped.max()
+    return distribution.reset_index()
+
+
+def score_percentiles(frame):
+    quantiles = frame.groupby(LESSON + ['level'], observed=True)[SCORE_COLUMNS].quantile(PERCENTILES)
+    quantiles = quantiles.unstack()
+    quantiles.columns = pd.MultiIndex.from_tuples([(column, f'p{int(q * 100)}') for column, q in quantiles.columns])
+    return quantiles.reset_index()
+
+
+def build_analytics(df) -> dict:
+    # Пустой прогон -- пустые листы, как и у основной выгрузки
+    if df.empty:
+        return {name: pd.DataFrame() for name in ('Students', 'Lessons', 'Lateness', 'Scores')}
+    frame = _prepare(df)
+    return {
+        'Students': completion_by_student(frame),
+        'Lessons': completion_by_lesson(frame),
+        'Lateness': lateness_distribution(frame),
+        'Scores': score_percentiles(frame),
+    }
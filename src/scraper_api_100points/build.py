@@ -1,26 +1,26 @@
+import argparse
 import asyncio
 import datetime
 import time
 
-import numpy as np
-import openpyxl
 import aiohttp
 import ssl
 import certifi
 import re
 import os
 import sys
-import pandas as pd
-import csv
 
 from aiohttp import ClientSession
 from bs4 import BeautifulSoup, SoupStrainer
-from pickle import load, dump
-from prettytable import PrettyTable
 from tqdm import tqdm
 import configparser
 from pathlib import Path
 
+from yarl import URL
+
+from cookie_store import CookieStore
+from profiling import StageProfiler
+
 
 
 
@@ -34,6 +34,8 @@ class AuthenticationError(Exception):
 
 
 def save_to_csv(data, csv_filename):
+    import csv
+
     os.makedirs('data/output', exist_ok=True)
     csv_path = f'data/output/{csv_filename}'
     with open(csv_path, 'w', newline='') as csv_file:
@@ -45,6 +47,11 @@ def save_to_csv(data, csv_filename):
 
 
 def process_and_save_data(raw_data, csv_filename):
+    # pandas и openpyxl импортируются только после сбора: запуск и авторизация не ждут ~0.5 с импорта.
+    # openpyxl -- движок pd.ExcelWriter, явный импорт нужен, чтобы PyInstaller включил его в сборку
+    import pandas as pd
+    import openpyxl
+
     try:
         df = pd.DataFrame(raw_data)
 
@@ -172,6 +179,7 @@ class WebScraper:
         self.data = []
         self.task_number = 0
         self.semaphore = asyncio.Semaphore(connections_limit)
+        self.cookie_store = CookieStore(f'{self.config.email}.cookies.json')
 
     async def _create_session(self):
         headers = {
@@ -188,8 +196,7 @@ class WebScraper:
     async def _authenticate(self):
 
         print("[INFO] Попытка авторизации через cookies.")
-        await self.load_session_cookies()
-        if await self.is_auth():
+        if await self.load_session_cookies() and await self.is_auth():
             print("[INFO] Успешная аутентификация через cookies.")
             return
 
@@ -242,24 +249,19 @@ class WebScraper:
             print("[INFO] Сессия закрыта.")
 
     async def save_session_cookies(self):
-        cookies = self.session.cookie_jar.filter_cookies('https://api.100points.ru/myself')
-        if not cookies:
-            print("['WARNING'] cookies not saved")
-            return
-        filename = f'{self.config.email}.pkl'
-        with open(filename, 'wb') as f:
-            dump(cookies, f)
-
-    async def load_session_cookies(self):
         try:
-            filename = f'{self.config.email}.pkl'
-            with open(filename, 'rb') as f:
-                cookies = load(f)
-                self.session.cookie_jar.update_cookies(cookies)
-        except FileNotFoundError:
-            print(f'[WARNING] cookies file not found')
-        except Exception as e:
-            print(f'[ERROR] Could not load cookies. Exception {e}')
+            if not self.cookie_store.save(self.session.cookie_jar):
+                print("[WARNING] cookies not saved")
+        except OSError as e:
+            print(f'[ERROR] Could not save cookies. Exception {e}')
+
+    async def load_session_cookies(self) -> bool:
+        cookies = self.cookie_store.load()
+        if cookies is None:
+            print(f'[WARNING] no valid cookies in {self.cookie_store.path}')
+            return False
+        self.session.cookie_jar.update_cookies(cookies, response_url=URL('https://api.100points.ru'))
+        return True
 
     async def _fetch_filter_options(self, filter: str) -> list[dict]:
         filter_selection = None
@@ -418,6 +420,8 @@ class WebScraper:
         return self.custom_params['lesson_id'] or 0
 
     async def print_table(self):
+        from prettytable import PrettyTable
+
         if len(self.data) == 0:
             print('[WARNING] data is empty')
         fields = list(self.data[0].keys())
@@ -472,19 +476,29 @@ class WebScraper:
 
 
 async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--profile', action='store_true',
+                        help='профиль cProfile и tracemalloc сбора и обработки в excel_output/profile--<время>/')
+    args = parser.parse_args()
+
     print('Hello')
     start = time.time()
 
     config = AppConfig('scraper.ini')
+    current_time = datetime.datetime.now().strftime("%d_%m_%Y_%H_%M")
+    # В этой сборке скрепер не разбит на этапы, профиль снимается целиком со сбора и с обработки
+    profiler = StageProfiler(Path('excel_output') / f'profile--{current_time}' if args.profile else None)
 
     test = WebScraper(config, connections_limit=50)
-    await test.run_scraping()
+    with profiler.stage('scraping'):
+        await test.run_scraping()
     data = await test.get_data()
 
-    current_time = datetime.datetime.now().strftime("%d_%m_%Y_%H_%M")
     csv_filename = f'{await test.get_module()}--{await test.get_lesson()}--{current_time}.xlsx'
 
-    process_and_save_data(data, csv_filename)
+    with profiler.stage('processing'):
+        process_and_save_data(data, csv_filename)
+    profiler.finish()
 
     end = time.time()
     print("[TIME]The time of execution of above program is :",
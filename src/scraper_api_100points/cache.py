@@ -0,0 +1,125 @@
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+from yarl import URL
+
+# Время жизни ответа по адресу страницы, сек. Страницы домашних заданий не кэшируются
+DEFAULT_TTL = {
+    'student_homework/index': 300,
+}
+
+
+def full_url(url: str, params: dict = None) -> str:
+    if not params:
+        return str(URL(url))
+    return str(URL(url).update_query({key: value for key, value in params.items() if value is not None}))
+
+
+# Дисковый кэш HTML-ответов: ключ -- хэш полного адреса с параметрами, вытеснение по давности использования.
+# Папку могут делить несколько процессов (--groups): файл может исчезнуть в любой момент, а ошибка кэша
+# не должна срывать запрос, поэтому ошибки файловой системы считаются промахом
+class ResponseCache:
+    def __init__(self, directory: str = '.http_cache', namespace: str = '', ttl: dict = None,
+                 max_size: int = 50 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.namespace = namespace
+        self.ttl = DEFAULT_TTL if ttl is None else ttl
+        self.max_size = max_size
+        # Размер папки считается один раз и дальше обновляется при записи; пересчет -- только при вытеснении
+        self._size = None
+        self.hits = 0
+        self.misses = 0
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _ttl_for(self, url: str) -> int:
+        path = URL(url).path
+        for endpoint, ttl in self.ttl.items():
+            if path.endswith(endpoint):
+                return ttl
+        return 0
+
+    def _path_for(self, url: str, params: dict = None) -> Path:
+        key = hashlib.sha256(f'{self.namespace}|{full_url(url, params)}'.encode('utf-8')).hexdigest()
+        return self.directory / f'{key}.json'
+
+    def get(self, url: str, params: dict = None):
+        if self._ttl_for(url) <= 0:
+            return None
+
+        path = self._path_for(url, params)
+        try:
+            with open(path, encoding='utf-8') as f:
+                entry = json.load(f)
+            if time.time() - entry['stored_at'] > self._ttl_for(url):
+                path.unlink(missing_ok=True)
+                self.misses += 1
+                return None
+            # mtime файла -- время последнего обращения, по нему работает LRU
+            os.utime(path)
+        except (OSError, ValueError, KeyError):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return entry['body']
+
+    def set(self, url: str, params: dict, body: str):
+        if self._ttl_for(url) <= 0:
+            return
+
+        entry = {'url': full_url(url, params), 'stored_at': time.time(), 'body': body}
+        path = self._path_for(url, params)
+        # У каждого процесса свой временный файл, os.replace атомарен
+        tmp_path = path.with_name(f'{path.stem}.{os.getpid()}.tmp')
+        try:
+            if self._size is None:
+                self._size = sum(size for size, _, _ in self._scan())
+            old_size = _file_size(path)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+            self._size += _file_size(path) - old_size
+            if self._size > self.max_size:
+                self._evict()
+        except OSError as e:
+            print(f'[WARNING] Cache write failed for {full_url(url, params)}. Exception {e}')
+            tmp_path.unlink(missing_ok=True)
+
+    def _scan(self):
+        # (размер, mtime, путь) для каждой записи; записи, удаленные другим процессом во время обхода, пропускаются
+        entries = []
+        for path in self.directory.glob('*.json'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_size, stat.st_mtime, path))
+        return entries
+
+    def _evict(self):
+        # Папку могли менять другие процессы, поэтому при вытеснении размер пересчитывается.
+        # Удаляется с запасом до 90% max_size, чтобы не вытеснять при каждой следующей записи
+        entries = self._scan()
+        total_size = sum(size for size, _, _ in entries)
+        target = self.max_size * 0.9
+        for size, _, path in sorted(entries, key=lambda entry: entry[1]):
+            if total_size <= target:
+                break
+            path.unlink(missing_ok=True)
+            total_size -= size
+        self._size = total_size
+
+    def clear(self):
+        for path in self.directory.glob('*.json'):
+            path.unlink(missing_ok=True)
+        self._size = 0
+
+
+def _file_size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except FileNotFoundError:
+        return 0
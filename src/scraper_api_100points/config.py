@@ -1,6 +1,9 @@
 import configparser
 from pathlib import Path
 
+# Выборка "все уроки модуля по отдельности" в пакетном режиме: 12:*
+ALL_LESSONS = '*'
+
 class AppConfig:
     def __init__(self, config_file_name):
         self.config = configparser.ConfigParser()
@@ -40,11 +43,29 @@ class AppConfig_test:
 
             self.course_id = self._get_config_value('main', 'course_id', data_type=int)
             self.group_id = self._get_config_value('main', 'group_id', data_type=int)
+            # Необязательный список групп для параллельного сбора: "1840:12, 1840:13"
+            self.groups = parse_groups(self.config.get('main', 'groups', fallback=''))
 
             # Получаем параметры из [setting]
             self.filling_in_the_template = self._get_config_value('setting', 'filling_in_the_template', data_type=bool)
             self.show_homeworks_in_the_terminal = self._get_config_value('setting', 'show_homeworks_in_the_terminal', data_type=bool)
 
+            # Необязательные параметры [setting], пользователь их не вводит
+            self.incremental = self.config.getboolean('setting', 'incremental', fallback=False)
+            # Процессов для разбора HTML; 0 -- разбор в основном процессе
+            self.parse_workers = self.config.getint('setting', 'parse_workers', fallback=0)
+            # Глубина очереди ссылок между страницами списка и загрузкой заданий
+            self.queue_size = self.config.getint('setting', 'queue_size', fallback=200)
+            self.rate_limits = {
+                'student_homework/index': self.config.getfloat('setting', 'listing_qps', fallback=20),
+                'student_homework/view': self.config.getfloat('setting', 'homework_qps', fallback=100),
+            }
+            self.batch_selections = parse_selections(self.config.get('batch', 'selections', fallback=''))
+            # Режим демона (--daemon): период сбора в минутах и адрес локального HTTP API
+            self.daemon_interval = self.config.getfloat('daemon', 'interval', fallback=30)
+            self.daemon_host = self.config.get('daemon', 'host', fallback='127.0.0.1')
+            self.daemon_port = self.config.getint('daemon', 'port', fallback=8080)
+
         except Exception as e:
             print(f"[ERROR] Ошибка чтения конфигурационного файла: {e}")
 
@@ -101,6 +122,34 @@ class AppConfig_test:
             print("Config successfully written.")
 
 
+def parse_groups(text: str) -> list[tuple]:
+    # "1840:12, 1840:13" -> [(1840, 12), (1840, 13)]
+    groups = []
+    for item in text.replace(';', ',').split(','):
+        item = item.strip()
+        if not item:
+            continue
+        course_id, _, group_id = item.partition(':')
+        groups.append((int(course_id), int(group_id)))
+    return groups
+
+
+def parse_selections(text: str) -> list[tuple]:
+    # "12:34, 12:*, 15" -> [(12, 34), (12, '*'), (15, None)]; без урока -- весь модуль одной выборкой
+    selections = []
+    for item in text.replace(';', ',').split(','):
+        item = item.strip()
+        if not item:
+            continue
+        module_id, _, lesson_id = item.partition(':')
+        lesson_id = lesson_id.strip()
+        if lesson_id == ALL_LESSONS:
+            selections.append((int(module_id), ALL_LESSONS))
+        else:
+            selections.append((int(module_id), int(lesson_id) if lesson_id else None))
+    return selections
+
+
 def _is_validate(option, data_type=None):
     if option is None:
         return False
@@ -0,0 +1,159 @@
+import asyncio
+import json
+import os
+import socket
+import time
+import uuid
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from http.cookies import SimpleCookie
+from pathlib import Path
+
+# Если сервер не указал срок жизни cookies: сессия Laravel по умолчанию живет 120 минут
+DEFAULT_LIFETIME = 2 * 60 * 60
+# Cookies считаются истекшими немного раньше срока, чтобы не начинать сбор с почти мертвой сессией
+EXPIRY_MARGIN = 60
+
+_ATTRIBUTES = ('domain', 'path', 'expires', 'max-age', 'secure', 'httponly', 'samesite')
+
+
+def _cookie_expiry(morsel, now: float):
+    if morsel['max-age']:
+        return now + int(morsel['max-age'])
+    if morsel['expires']:
+        try:
+            return parsedate_to_datetime(morsel['expires']).timestamp()
+        except (TypeError, ValueError):
+            return None
+    return None
+
+
+# Cookies сессии в JSON вместо pickle: файл можно читать без выполнения кода и в нем хранится срок жизни.
+# Вход по логину/паролю защищен файлом-замком, чтобы из нескольких процессов его выполнял только один
+class CookieStore:
+    def __init__(self, path, lock_timeout: float = 120, stale_lock: float = 60, poll_interval: float = 0.2):
+        self.path = Path(path)
+        self.lock_path = self.path.with_name(self.path.name + '.lock')
+        self.lock_timeout = lock_timeout
+        self.stale_lock = stale_lock
+        self.poll_interval = poll_interval
+
+    def save(self, cookie_jar) -> bool:
+        now = time.time()
+        cookies = []
+        expiries = []
+        for morsel in cookie_jar:
+            cookies.append({'name': morsel.key, 'value': morsel.value,
+                            **{attribute: morsel[attribute] for attribute in _ATTRIBUTES if morsel[attribute]}})
+            expiry = _cookie_expiry(morsel, now)
+            if expiry is not None:
+                expiries.append(expiry)
+        if not cookies:
+            return False
+
+        data = {'saved': now, 'expires': min(expiries, default=now + DEFAULT_LIFETIME), 'cookies': cookies}
+        # Запись через временный файл: другой процесс не прочитает файл наполовину
+        temp_path = self.path.with_name(f'{self.path.name}.{os.getpid()}.tmp')
+        with open(os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        os.replace(temp_path, self.path)
+        return True
+
+    def load(self):
+        # None, если файла нет, он поврежден или cookies истекли
+        try:
+            data = json.loads(self.path.read_text(encoding='utf-8'))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f'[WARNING] Could not read cookies {self.path}. Exception {e}')
+            return None
+
+        if data.get('expires', 0) - EXPIRY_MARGIN < time.time():
+            return None
+
+        cookies = SimpleCookie()
+        for cookie in data.get('cookies', []):
+            cookies[cookie['name']] = cookie['value']
+            for attribute in _ATTRIBUTES:
+                if attribute in cookie:
+                    cookies[cookie['name']][attribute] = cookie[attribute]
+        return cookies
+
+    @asynccontextmanager
+    async def lock(self):
+        # O_CREAT | O_EXCL атомарен и в Windows, и в POSIX, поэтому замок не зависит от fcntl/msvcrt.
+        # В замок пишется уникальная метка: удаляется он, только если метка в нем все еще наша
+        token = f'{socket.gethostname()} {os.getpid()} {uuid.uuid4().hex}'
+        deadline = time.monotonic() + self.lock_timeout
+        while True:
+            try:
+                fd = os.open(self.lock_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL)
+                break
+            except FileExistsError:
+                holder = self._read_lock()
+                if holder is not None and self._is_stale(holder):
+                    # Процесс-владелец упал, не удалив замок
+                    print(f'[WARNING] Removing stale lock {self.lock_path}')
+                    self._unlink_lock(holder)
+                    continue
+                if time.monotonic() > deadline:
+                    # Живой замок не удаляется: в худшем случае войдут два процесса
+                    print(f'[WARNING] Lock {self.lock_path} is still held, continuing without it')
+                    yield
+                    return
+                await asyncio.sleep(self.poll_interval)
+
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(token)
+        heartbeat = asyncio.create_task(self._heartbeat(token))
+        try:
+            yield
+        finally:
+            heartbeat.cancel()
+            self._unlink_lock(token)
+
+    async def _heartbeat(self, token: str):
+        # Пока замок занят, его mtime обновляется: устаревшим считается только брошенный замок
+        while True:
+            await asyncio.sleep(self.stale_lock / 4)
+            if self._read_lock() != token:
+                return
+            try:
+                os.utime(self.lock_path)
+            except FileNotFoundError:
+                return
+
+    def _read_lock(self):
+        try:
+            return self.lock_path.read_text(encoding='utf-8')
+        except FileNotFoundError:
+            return None
+
+    def _is_stale(self, holder: str) -> bool:
+        try:
+            if time.time() - self.lock_path.stat().st_mtime > self.stale_lock:
+                return True
+        except FileNotFoundError:
+            return False
+        # Владелец на этой же машине проверяется сразу, не дожидаясь stale_lock
+        host, _, rest = holder.partition(' ')
+        pid = rest.partition(' ')[0]
+        if os.name != 'posix' or host != socket.gethostname() or not pid.isdigit():
+            return False
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            return True
+        except OSError:
+            return False
+        return False
+
+    def _unlink_lock(self, token: str):
+        # Между чтением и удалением замок может смениться, но окно намного меньше интервала опроса
+        if self._read_lock() != token:
+            return
+        try:
+            self.lock_path.unlink()
+        except FileNotFoundError:
+            pass
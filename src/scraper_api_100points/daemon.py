@@ -0,0 +1,160 @@
+import asyncio
+import csv
+import io
+import json
+import time
+from datetime import datetime
+
+from aiohttp import web
+
+from records import FIELDS
+from retry import RetryPolicy
+from sharding import WHOLE_COURSE
+
+
+def _timestamp(value):
+    return datetime.fromtimestamp(value).isoformat(timespec='seconds') if value else None
+
+
+def build_pivot(records):
+    # Та же сводная таблица, что и в xlsx, но со столбцами "test_score|Базовый" для JSON/CSV
+    from data_processing import _flatten_result, build_tables
+
+    _, table = build_tables(records)
+    return None if table is None else _flatten_result(table)
+
+
+# Режим демона: одна авторизованная сессия с пулом соединений живет между сборами,
+# сборы идут по расписанию, последние записи и сводная таблица отдаются по локальному HTTP API
+class ScrapeDaemon:
+    def __init__(self, scraper, selections=None, interval: float = 1800, host: str = '127.0.0.1',
+                 port: int = 8080):
+        self.scraper = scraper
+        self.selections = selections or WHOLE_COURSE
+        self.interval = interval
+        self.host = host
+        self.port = port
+        self.records = []
+        self.table = None
+        self.runs = 0
+        self.running = False
+        self.last_started = None
+        self.last_finished = None
+        self.last_duration = None
+        self.last_error = None
+        self.next_run = None
+        self._refresh = None
+
+    async def scrape_once(self):
+        self.running = True
+        self.last_started = time.time()
+        try:
+            # Cookies могли истечь между сборами
+            if await self.scraper.is_auth() is False:
+                await self.scraper._authenticate()
+            # Неудачный повторный вход прошлого сбора больше не действует: сессия проверена заново
+            self.scraper.auth_gate.error = None
+            self.scraper.retry_policy = RetryPolicy(metrics=self.scraper.metrics)
+            await self.scraper.scrape_batch(self.selections)
+            records = self.scraper.data
+            table = await asyncio.to_thread(build_pivot, records)
+            # Данные подменяются целиком, запросы к API во время сбора видят предыдущий результат
+            self.records, self.table = records, table
+            self.last_error = None
+        except Exception as e:
+            self.last_error = f'{type(e).__name__}: {e}'
+            print(f'[ERROR] Сбор по расписанию не выполнен. Exception {e}')
+        finally:
+            self.running = False
+            self.runs += 1
+            self.last_finished = time.time()
+            self.last_duration = self.last_finished - self.last_started
+            print(f'[INFO] Сбор #{self.runs}: {len(self.records)} записей за {self.last_duration:.1f} s')
+
+    async def _schedule(self):
+        while True:
+            await self.scrape_once()
+            self.next_run = time.time() + self.interval
+            try:
+                await asyncio.wait_for(self._refresh.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._refresh.clear()
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.add_routes([
+            web.get('/status', self.status),
+            web.get('/records', self.get_records),
+            web.get('/pivot', self.get_pivot),
+            web.post('/refresh', self.refresh),
+            web.get('/metrics', self.get_metrics),
+        ])
+        return app
+
+    async def status(self, request):
+        return web.json_response({
+            'runs': self.runs,
+            'running': self.running,
+            'records': len(self.records),
+            'last_started': _timestamp(self.last_started),
+            'last_finished': _timestamp(self.last_finished),
+            'last_duration': self.last_duration,
+            'last_error': self.last_error,
+            'next_run': None if self.running else _timestamp(self.next_run),
+            'interval': self.interval,
+            'limiter_limit': self.scraper.limiter.limit,
+            'selections': [list(selection) for selection in self.selections],
+        })
+
+    @staticmethod
+    def _format(request) -> str:
+        export_format = request.query.get('format', 'json')
+        if export_format not in ('json', 'csv'):
+            raise web.HTTPBadRequest(text='format: json или csv')
+        return export_format
+
+    async def get_records(self, request):
+        export_format = self._format(request)
+        if export_format == 'csv':
+            buffer = io.StringIO()
+            writer = csv.writer(buffer, delimiter=';')
+            writer.writerow(FIELDS)
+            writer.writerows(record.as_tuple() for record in self.records)
+            return web.Response(text=buffer.getvalue(), content_type='text/csv')
+        return web.json_response([record.to_dict() for record in self.records],
+                                 dumps=lambda data: json.dumps(data, ensure_ascii=False, default=str))
+
+    async def get_pivot(self, request):
+        export_format = self._format(request)
+        if self.table is None:
+            raise web.HTTPServiceUnavailable(text='сводная таблица еще не построена')
+        if export_format == 'csv':
+            return web.Response(text=self.table.to_csv(sep=';', index=False), content_type='text/csv')
+        return web.Response(text=self.table.to_json(orient='records', force_ascii=False),
+                            content_type='application/json')
+
+    async def refresh(self, request):
+        if not self.running:
+            self._refresh.set()
+        return web.json_response({'scheduled': not self.running}, status=202)
+
+    async def get_metrics(self, request):
+        if self.scraper.metrics is None:
+            raise web.HTTPNotFound(text='метрики выключены, запустите с --metrics')
+        self.scraper.update_metrics_gauges()
+        return web.Response(text=self.scraper.metrics.to_prometheus(), content_type='text/plain')
+
+    async def run(self):
+        self._refresh = asyncio.Event()
+        runner = web.AppRunner(self.make_app())
+        await runner.setup()
+        try:
+            await self.scraper._open()
+            await web.TCPSite(runner, self.host, self.port).start()
+            print(f'[INFO] Демон запущен: http://{self.host}:{self.port}/status, '
+                  f'сбор каждые {self.interval / 60:g} мин')
+            await self._schedule()
+        finally:
+            await runner.cleanup()
+            await self.scraper.close_session()
@@ -1,22 +1,46 @@
+import numpy as np
 import pandas as pd
 import os
 import csv
+from pathlib import Path
+
+from profiling import StageProfiler
+from records import FIELDS, INT_FIELDS, LEVELS, TIME_FIELDS, HomeworkRecord
 
 
 def save_to_csv(data, csv_filename):
     os.makedirs('data/output', exist_ok=True)
     csv_path = f'data/output/{csv_filename}'
     with open(csv_path, 'w', newline='') as csv_file:
-        fieldnames = data[0].keys()
-        csv_writer = csv.DictWriter(csv_file, fieldnames=fieldnames,  delimiter=';')
+        csv_writer = csv.writer(csv_file, delimiter=';')
+
+        csv_writer.writerow(FIELDS)
+        csv_writer.writerows(record.as_tuple() for record in _as_records(data))
+
+
+def _as_records(raw_data):
+    return [record if isinstance(record, HomeworkRecord) else HomeworkRecord.from_dict(record)
+            for record in raw_data]
 
-        csv_writer.writeheader()
-        csv_writer.writerows(data)
+
+def records_to_frame(raw_data):
+    # Типы уже приведены при сборе, DataFrame строится по столбцам без astype
+    records = _as_records(raw_data)
+    columns = {}
+    for field in FIELDS:
+        values = [getattr(record, field) for record in records]
+        if field in INT_FIELDS:
+            columns[field] = pd.array(values, dtype='int64' if None not in values else 'Int64')
+        elif field in TIME_FIELDS:
+            columns[field] = pd.to_datetime(pd.Series(values, dtype=object))
+        else:
+            columns[field] = values
+    return pd.DataFrame(columns)
 
 
 def process_data(raw_data):
     # Создание DataFrame из исходных данных
-    df = pd.DataFrame(raw_data)
+    df = records_to_frame(raw_data)
 
     # Группировка данных по 'email', 'lesson', 'level' и агрегация оценок
     df_grouped = df.groupby(['user_email', 'lesson', 'level']).agg({'test_score': 'max'}).reset_index()
@@ -29,34 +53,246 @@ def process_data(raw_data):
 
     return result_data
 
-def process_and_save_data(raw_data, csv_filename):
+PIVOT_INDEX = ['user_email', 'user_name', 'vk_id', 'course', 'module', 'lesson']
+PIVOT_VALUES = ['href', 'test_score']
+
+
+def _group_ids(frame, columns):
+    # Коды столбцов из отсортированных уникальных значений -> номер группы в лексикографическом порядке
+    codes, uniques = [], []
+    for column in columns:
+        # Пропуск (ученик без VK ID) -- отдельное значение, как dropna=False в groupby, а не потерянная строка
+        column_codes, column_uniques = pd.factorize(frame[column], sort=True, use_na_sentinel=False)
+        codes.append(column_codes)
+        uniques.append(column_uniques)
+
+    dims = [max(len(column_uniques), 1) for column_uniques in uniques]
+    if np.prod(dims, dtype=float) < 2 ** 62:
+        keys, group_ids = np.unique(np.ravel_multi_index(codes, dims), return_inverse=True)
+        group_codes = np.unravel_index(keys, dims)
+    else:
+        keys, group_ids = np.unique(np.column_stack(codes), axis=0, return_inverse=True)
+        group_codes = keys.T
+    return group_ids.ravel(), [column_uniques.take(column_codes)
+                               for column_uniques, column_codes in zip(uniques, group_codes)]
+
+
+def _max_by_cell(cells, values, cells_count):
+    # Максимум по ячейкам (группа, уровень); -1 -- в ячейке нет значений
+    result = np.full(cells_count, -1, dtype=np.int64)
+    np.maximum.at(result, cells, values)
+    return result
+
+
+def pivot_max_by_level(df):
+    # То же, что pivot_table(values=PIVOT_VALUES, index=PIVOT_INDEX, columns='level', aggfunc='max',
+    # fill_value=' ', observed=False, dropna=False).reset_index(), но максимум считается по целочисленным кодам,
+    # а не по object
+    frame = df.dropna(subset=['level'])
+    if len(frame) < len(df):
+        print(f'[WARNING] {len(df) - len(frame)} работ без уровня сложности не попали в сводную таблицу')
+    levels = frame['level'].cat.categories
+    group_ids, index_values = _group_ids(frame, PIVOT_INDEX)
+    groups_count = len(index_values[0])
+    cells = group_ids * len(levels) + frame['level'].cat.codes.to_numpy()
+    cells_count = groups_count * len(levels)
+
+    columns = {(column, ''): values for column, values in zip(PIVOT_INDEX, index_values)}
+    for value in PIVOT_VALUES:
+        values = frame[value]
+        present = values.notna().to_numpy()
+        if value == 'href':
+            # Ранги строк в отсортированном словаре: максимум ранга == лексикографический максимум строки
+            codes, uniques = pd.factorize(values[present], sort=True)
+            best = _max_by_cell(cells[present], codes, cells_count)
+            decoded = np.asarray(uniques, dtype=object).take(np.maximum(best, 0))
+        else:
+            best = _max_by_cell(cells[present], values[present].to_numpy(dtype=np.int64), cells_count)
+            decoded = best.astype(object)
+        found = (best >= 0).reshape(groups_count, len(levels))
+        filled = np.where(best >= 0, decoded, ' ').reshape(groups_count, len(levels))
+        for level_number, level in enumerate(levels):
+            # Как dropna=True в pivot_table: уровень без единого значения не выводится
+            if found[:, level_number].any():
+                columns[(value, level)] = filled[:, level_number]
+
+    table = pd.DataFrame(columns)
+    table.columns = pd.MultiIndex.from_tuples(columns.keys(), names=[None, 'level'])
+    return table
+
+
+def build_tables(raw_data):
+    df, table = None, None
     try:
-        df = pd.DataFrame(raw_data)
+        df = records_to_frame(raw_data)
 
-        df['vk_id'] = df['vk_id'].astype(int)
-        df['test_score'] = df['test_score'].astype(int)
-        custom_order = ['Базовый', 'Средний', 'Сложный']
         # Задаем категориальный тип данных с указанным порядком
-        level_dtype = pd.CategoricalDtype(categories=custom_order, ordered=True)
+        level_dtype = pd.CategoricalDtype(categories=LEVELS, ordered=True)
         # Применяем категориальный тип данных к столбцу 'level'
         df['level'] = df['level'].astype(level_dtype)
 
-        table = pd.pivot_table(df, values=['test_score', 'href'],
-                               index=['user_email', 'user_name', 'vk_id', 'course', 'module', 'lesson'],
-                               columns=['level'], aggfunc='max', fill_value=' ', observed=False).reset_index()
+        table = pivot_max_by_level(df)
 
         # Переупорядочиваем уровни столбцов
         table.sort_values(by=['course', 'module', 'lesson'], ascending=False, inplace=True, ignore_index=True)
     except Exception as e:
         print(f'[ERROR] process data if fault, exception {e}')
 
+    return df, table
+
+
+def save_excel(df, table, csv_filename, extra_sheets=None):
+    # openpyxl не нужен для parquet/arrow без --excel-view
+    from excel_writer import StreamingExcelWriter
+
     try:
         os.makedirs('excel_output', exist_ok=True)
-        with pd.ExcelWriter(f'excel_output/{csv_filename}') as writer:
+        with StreamingExcelWriter(f'excel_output/{csv_filename}') as writer:
             try:
-                table.to_excel(writer, sheet_name='Result')
+                writer.write_frame(table, sheet_name='Result')
             except Exception as e:
                 pass
-            df.to_excel(writer, sheet_name='Data')
+            writer.write_frame(df, sheet_name='Data')
+            for sheet_name, frame in (extra_sheets or {}).items():
+                writer.write_frame(frame, sheet_name=sheet_name)
     except Exception as e:
-        print(f'[ERROR] save data if fault, exception {e}')
\ No newline at end of file
+        print(f'[ERROR] save data if fault, exception {e}')
+
+
+# Столбцы сводной таблицы ('test_score', 'Базовый') хранятся в колоночных файлах как 'test_score|Базовый'
+COLUMN_SEPARATOR = '|'
+COLUMNAR_SUFFIXES = {'parquet': '.parquet', 'arrow': '.arrow'}
+
+
+def _dictionary_encode(frame):
+    # Повторяющиеся строки (курс, модуль, урок, статус...) пишутся словарем, уникальные (href) -- как есть
+    frame = frame.copy()
+    for column in frame.columns:
+        values = frame[column]
+        if pd.api.types.is_object_dtype(values) or pd.api.types.is_string_dtype(values):
+            if values.nunique(dropna=True) <= len(values) // 2:
+                frame[column] = values.astype('category')
+    return frame
+
+
+def _flatten_result(table):
+    result = table.copy()
+    result.columns = [COLUMN_SEPARATOR.join(str(part) for part in column if part != '') for column in table.columns]
+    for column in result.columns:
+        values = result[column]
+        if not pd.api.types.is_object_dtype(values):
+            continue
+        # fill_value=' ' смешивает строки и числа в одном столбце, в колоночном формате пропуск -- это null
+        values = values.where(values != ' ')
+        numbers = pd.to_numeric(values, errors='coerce')
+        if numbers.notna().sum() == values.notna().sum():
+            result[column] = numbers.astype('Int64')
+        else:
+            result[column] = values.astype('string')
+    return result
+
+
+def _restore_result(result):
+    table = result.copy()
+    table.columns = pd.MultiIndex.from_tuples(
+        [tuple(column.split(COLUMN_SEPARATOR, 1)) if COLUMN_SEPARATOR in column else (column, '')
+         for column in result.columns],
+        names=[None, 'level'])
+    return table.astype(object).where(table.notna(), ' ')
+
+
+def _columnar_paths(csv_filename, export_format):
+    stem = Path(csv_filename).stem
+    suffix = COLUMNAR_SUFFIXES[export_format]
+    return Path('excel_output') / f'{stem}.data{suffix}', Path('excel_output') / f'{stem}.result{suffix}'
+
+
+def _write_columnar(frame, path, export_format):
+    import pyarrow as pa
+
+    arrow_table = pa.Table.from_pandas(frame, preserve_index=False)
+    if export_format == 'parquet':
+        import pyarrow.parquet as pq
+        pq.write_table(arrow_table, path)
+    else:
+        with pa.OSFile(str(path), 'wb') as sink, pa.ipc.new_file(sink, arrow_table.schema) as writer:
+            writer.write_table(arrow_table)
+
+
+def load_columnar(path):
+    import pyarrow as pa
+
+    path = Path(path)
+    if path.suffix == '.parquet':
+        import pyarrow.parquet as pq
+        return pq.read_table(path).to_pandas()
+    with pa.memory_map(str(path), 'r') as source:
+        return pa.ipc.open_file(source).read_all().to_pandas()
+
+
+def save_columnar(df, table, csv_filename, export_format='parquet'):
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        print(f'[ERROR] Для экспорта в {export_format} нужен пакет pyarrow (pip install pyarrow)')
+        return None
+
+    data_path, result_path = _columnar_paths(csv_filename, export_format)
+    try:
+        os.makedirs('excel_output', exist_ok=True)
+        _write_columnar(_dictionary_encode(df), data_path, export_format)
+        if table is not None:
+            _write_columnar(_dictionary_encode(_flatten_result(table)), result_path, export_format)
+        print(f'[INFO] Данные сохранены в {data_path} и {result_path}')
+    except Exception as e:
+        print(f'[ERROR] save columnar data if fault, exception {e}')
+        return None
+    return data_path, result_path
+
+
+def save_analytics_columnar(analytics_tables, csv_filename, export_format='parquet'):
+    stem = Path(csv_filename).stem
+    suffix = COLUMNAR_SUFFIXES[export_format]
+    try:
+        for name, frame in analytics_tables.items():
+            _write_columnar(_flatten_result(frame), Path('excel_output') / f'{stem}.{name.lower()}{suffix}',
+                            export_format)
+    except Exception as e:
+        print(f'[ERROR] save analytics if fault, exception {e}')
+
+
+def columnar_to_excel(data_path, result_path, csv_filename, extra_sheets=None):
+    # Excel как представление уже сохраненных колоночных файлов
+    df = load_columnar(data_path)
+    table = _restore_result(load_columnar(result_path)) if Path(result_path).exists() else None
+    save_excel(df, table, csv_filename, extra_sheets)
+
+
+def build_analytics_tables(df):
+    from analytics import build_analytics
+
+    try:
+        return build_analytics(df)
+    except Exception as e:
+        print(f'[ERROR] analytics if fault, exception {e}')
+        return {}
+
+
+def process_and_save_data(raw_data, csv_filename, export_format='xlsx', excel_view=False, analytics=False,
+                          profiler=None):
+    profiler = profiler or StageProfiler()
+    with profiler.stage('processing'):
+        df, table = build_tables(raw_data)
+        # Аналитика (выполнение, опоздания, распределение баллов) сохраняется рядом с основной таблицей
+        analytics_tables = build_analytics_tables(df) if analytics and df is not None else {}
+
+    with profiler.stage('export'):
+        if export_format == 'xlsx':
+            save_excel(df, table, csv_filename, analytics_tables)
+            return
+
+        paths = save_columnar(df, table, csv_filename, export_format)
+        if paths:
+            save_analytics_columnar(analytics_tables, csv_filename, export_format)
+        if paths and excel_view:
+            columnar_to_excel(*paths, csv_filename, analytics_tables)
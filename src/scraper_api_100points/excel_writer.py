@@ -0,0 +1,74 @@
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+
+
+def _cell(value):
+    if isinstance(value, str) or value is None:
+        return value
+    if pd.api.types.is_scalar(value) and pd.isna(value):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    if hasattr(value, 'item'):
+        # numpy-скаляры -> int/float
+        return value.item()
+    return value
+
+
+def _header_rows(columns, index_name):
+    # Повторяет разметку DataFrame.to_excel: для MultiIndex каждая строка заголовка начинается с имени уровня,
+    # одинаковые соседние подписи верхних уровней объединяются, затем идет строка имен индекса
+    if columns.nlevels == 1:
+        return [[index_name, *(_cell(label) for label in columns)]], []
+
+    rows, merges = [], []
+    for level in range(columns.nlevels):
+        labels = [column[level] for column in columns]
+        row = [columns.names[level]]
+        last_level = level == columns.nlevels - 1
+        start = 0
+        while start < len(columns):
+            end = start
+            if not last_level:
+                prefix = columns[start][:level + 1]
+                while end + 1 < len(columns) and columns[end + 1][:level + 1] == prefix:
+                    end += 1
+            row.append(labels[start] if labels[start] != '' else None)
+            row.extend([None] * (end - start))
+            if end > start:
+                merges.append(f'{get_column_letter(start + 2)}{level + 1}:{get_column_letter(end + 2)}{level + 1}')
+            start = end + 1
+        rows.append(row)
+
+    rows.append([index_name] + [None] * len(columns))
+    return rows, merges
+
+
+# Запись xlsx в режиме write_only: строки уходят в файл по мере обхода, целиком лист в памяти не строится
+class StreamingExcelWriter:
+    def __init__(self, path):
+        self.path = path
+        self.workbook = Workbook(write_only=True)
+
+    def write_frame(self, frame, sheet_name):
+        sheet = self.workbook.create_sheet(sheet_name)
+        header, merges = _header_rows(frame.columns, frame.index.name)
+        for row in header:
+            sheet.append(row)
+        for cell_range in merges:
+            sheet.merged_cells.add(cell_range)
+
+        for index, row in zip(frame.index, frame.itertuples(index=False, name=None)):
+            sheet.append([_cell(index), *(_cell(value) for value in row)])
+
+    def close(self):
+        self.workbook.save(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        return False
@@ -6,3 +6,11 @@ class AuthenticationError(Exception):
         self.message = f"{message}. Статус-код: {self.status_code}. URL: {self.url}. Данные авторизации: {self.data}"
         super().__init__(self.message)
 
+
+
+class SessionExpiredError(Exception):
+    # Сервер перенаправил запрос на страницу входа: cookies сессии больше не действуют
+    def __init__(self, url, generation):
+        self.url = url
+        self.generation = generation
+        super().__init__(f"Сессия истекла, запрос перенаправлен на вход. URL: {url}")
@@ -0,0 +1,73 @@
+import re
+from collections import namedtuple
+
+from lxml import etree, html as lxml_html
+
+
+def _has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+# Путь до блоков страницы домашнего задания: card-body -> row -> form-group col-md-3
+_CARD_BODY = etree.XPath(f"//div[{_has_class('card-body')}][1]")
+_ROW = etree.XPath(f".//div[{_has_class('row')}][1]")
+_FORM_GROUPS = etree.XPath(".//div[@class='form-group col-md-3']")
+
+
+def _nth_div(index: int) -> etree.XPath:
+    return etree.XPath(f"(.//div)[{index + 1}]")
+
+
+_SELF = etree.XPath(".")
+
+# name -- поле записи, block -- номер блока form-group, xpath -- элемент внутри блока,
+# regex/group -- извлекаемая часть текста (если xpath возвращает атрибут, regex не нужен)
+FieldSpec = namedtuple('FieldSpec', ['name', 'block', 'xpath', 'regex', 'group'])
+
+FIELDS = (
+    FieldSpec('user_email', 0, _SELF, re.compile(r'\S+@+\S+'), 0),
+    FieldSpec('user_name', 0, etree.XPath(f".//input[{_has_class('form-control')}][1]/@value"), None, 0),
+    FieldSpec('vk_id', 0, _nth_div(1), re.compile(r'(\d+)'), 0),
+    FieldSpec('lesson', 1, _nth_div(0), re.compile(r'Урок:\s*(.*)'), 1),
+    FieldSpec('module', 1, _nth_div(1), re.compile(r'Модуль:\s*(.*)'), 1),
+    FieldSpec('course', 1, _nth_div(2), re.compile(r'Курс:\s*(.*)'), 1),
+    FieldSpec('level', 1, _nth_div(3), re.compile(r'Сложность:\s*(.*)'), 1),
+    FieldSpec('status', 2, _SELF, re.compile(r'Статус\s*(.*)'), 1),
+    FieldSpec('submission_time', 3, _nth_div(0), re.compile(r'\d+.\d+.\d+\s+\d+:\d+:\d+'), 0),
+    FieldSpec('deadline_time', 3, _nth_div(2), re.compile(r'\d+.\d+.\d+\s+\d+:\d+:\d+'), 0),
+    FieldSpec('test_score', 4, _nth_div(0), re.compile(r'\d+'), 0),
+    FieldSpec('secondary_score', 4, _nth_div(1), re.compile(r'\d+'), 0),
+    FieldSpec('curator_score', 4, _nth_div(2), re.compile(r'\d+'), 0),
+    FieldSpec('result_score', 5, _nth_div(0), re.compile(r'\d+%+\s+\d+/+\d+'), 0),
+)
+
+
+def _extract_field(block, field: FieldSpec):
+    found = field.xpath(block)
+    if not found:
+        return None
+    value = found[0]
+    if isinstance(value, str):
+        return str(value)
+
+    text = value.text_content().strip()
+    if field.regex is None:
+        return text
+    match = field.regex.search(text)
+    return match.group(field.group) if match else None
+
+
+def extract_homework(html: str, url: str) -> dict:
+    tree = lxml_html.fromstring(html)
+    card_body = _CARD_BODY(tree)
+    if not card_body:
+        raise ValueError(f'card-body not found on {url}')
+    row = _ROW(card_body[0])
+    if not row:
+        raise ValueError(f'card-body row not found on {url}')
+    blocks = _FORM_GROUPS(row[0])
+
+    record = {"href": url}
+    for field in FIELDS:
+        record[field.name] = _extract_field(blocks[field.block], field)
+    return record
@@ -0,0 +1,67 @@
+import json
+from pathlib import Path
+
+
+# Журнал прогона: параметры выборки, обработанные страницы списка и собранные записи.
+# Пишется построчно в JSON Lines, поэтому после Ctrl+C или обрыва сети теряется не больше одной строки.
+# С path=None журнал не ведется
+class ScrapeJournal:
+    def __init__(self, path: str = 'scrape_journal.jsonl'):
+        self.path = Path(path) if path else None
+        self.params = None
+        self.pages = {}
+        self.records = {}
+        self._file = None
+
+    def load(self) -> bool:
+        if self.path is None or not self.path.exists():
+            return False
+
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Последняя строка могла оборваться при аварийном завершении
+                    continue
+                if entry['type'] == 'params':
+                    self.params = entry['params']
+                elif entry['type'] == 'page':
+                    self.pages[entry['page']] = [tuple(row) for row in entry['rows']]
+                elif entry['type'] == 'record':
+                    self.records[entry['record']['href']] = entry['record']
+        return self.params is not None
+
+    def pending_rows(self) -> list[tuple[str, str]]:
+        return [(url, row_hash) for rows in self.pages.values() for url, row_hash in rows
+                if url not in self.records]
+
+    def start(self, params: dict, resume: bool = False):
+        if self.path is None:
+            return
+        self._file = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+        if not resume:
+            self._write({'type': 'params', 'params': params})
+
+    def _write(self, entry: dict):
+        if self._file is None:
+            return
+        self._file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self._file.flush()
+
+    def page(self, page_number: int, rows: list[tuple[str, str]]):
+        self._write({'type': 'page', 'page': page_number, 'rows': rows})
+
+    def record(self, record: dict):
+        self._write({'type': 'record', 'record': record})
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def finish(self):
+        # Прогон завершен, продолжать нечего
+        self.close()
+        if self.path is not None:
+            self.path.unlink(missing_ok=True)
@@ -0,0 +1,176 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+import aiohttp
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+# Запросов в секунду по адресу страницы. Для остальных адресов ограничения нет
+DEFAULT_RATE_LIMITS = {
+    'student_homework/index': 20,
+    'student_homework/view': 100,
+}
+
+
+def _percentile(sorted_values: list[float], percent: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(percent / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+# AIMD-ограничитель параллельности: лимит растет на 1 за каждые limit успешных ответов,
+# пока текущая задержка (медиана последних sample ответов) близка к базовой, и уменьшается в backoff раз
+# при 429/5xx, таймаутах или росте задержки
+class AdaptiveLimiter:
+    def __init__(self, initial_limit: int = 10, min_limit: int = 1, max_limit: int = 50,
+                 backoff: float = 0.5, latency_tolerance: float = 2.0, window: int = 200, sample: int = 50,
+                 base_drift: float = 0.05):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self._limit = float(min(max(initial_limit, min_limit), max_limit))
+        self.in_flight = 0
+        self.latencies = deque(maxlen=window)
+        self.recent = deque(maxlen=sample)
+        # Базовая задержка -- минимум медианы окна window, растущий не быстрее base_drift в секунду. Медиана окна
+        # растет вместе с нагрузкой, поэтому сама базой быть не может: рост задержки от перегрузки сервера
+        # сравнивается с задержкой без нагрузки. Если сервер стал медленнее сам по себе, база постепенно догоняет его
+        self.base_drift = base_drift
+        self._base_latency = None
+        self._base_updated = None
+        self.smoothed_latency = None
+        self.errors = 0
+        self._last_decrease = 0.0
+        self._waiters = set()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def base_latency(self) -> float:
+        return self._base_latency or 0.0
+
+    @property
+    def current_latency(self) -> float:
+        # Медиана последних ответов, а не среднее: отдельные медленные ответы не снижают лимит
+        return _percentile(sorted(self.recent), 50)
+
+    def _update_base(self):
+        median = _percentile(sorted(self.latencies), 50)
+        now = time.monotonic()
+        if self._base_latency is None or median < self._base_latency:
+            self._base_latency = median
+        else:
+            drifted = self._base_latency * (1 + self.base_drift) ** (now - self._base_updated)
+            self._base_latency = min(median, drifted)
+        self._base_updated = now
+
+    def percentiles(self) -> dict:
+        values = sorted(self.latencies)
+        return {f'p{p}': _percentile(values, p) for p in (50, 90, 99)}
+
+    @asynccontextmanager
+    async def slot(self):
+        await self._acquire()
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException as e:
+            if self._is_overload(e):
+                self.errors += 1
+                self._decrease()
+            raise
+        else:
+            self._on_success(time.perf_counter() - started)
+        finally:
+            self._release()
+
+    async def _acquire(self):
+        while self.in_flight >= self.limit:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.add(waiter)
+            try:
+                await waiter
+            finally:
+                self._waiters.discard(waiter)
+        self.in_flight += 1
+
+    def _release(self):
+        self.in_flight -= 1
+        # Будим всех ожидающих: лимит мог как уменьшиться, так и вырасти
+        for waiter in self._waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    @staticmethod
+    def _is_overload(e: BaseException) -> bool:
+        if isinstance(e, asyncio.TimeoutError):
+            return True
+        return isinstance(e, aiohttp.ClientResponseError) and e.status in RETRYABLE_STATUSES
+
+    def _on_success(self, latency: float):
+        self.latencies.append(latency)
+        self.recent.append(latency)
+        self.smoothed_latency = latency if self.smoothed_latency is None \
+            else 0.9 * self.smoothed_latency + 0.1 * latency
+
+        if len(self.recent) == self.recent.maxlen:
+            self._update_base()
+            if self.current_latency > self.latency_tolerance * self.base_latency:
+                self._decrease()
+                return
+        self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+
+    def _decrease(self):
+        # Одна перегрузка задевает сразу много запросов: уменьшаем лимит не чаще раза за время ответа
+        now = time.perf_counter()
+        if now - self._last_decrease < (self.smoothed_latency or 0):
+            return
+        self._last_decrease = now
+        self._limit = max(self.min_limit, self._limit * self.backoff)
+        # Ответы, начатые до снижения, о новом лимите ничего не говорят
+        self.recent.clear()
+
+
+# Token bucket: в среднем rate запросов в секунду, всплеск не больше capacity запросов
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate / 10)
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        # Ожидающие обслуживаются по очереди, поэтому поток запросов остается равномерным
+        async with self._lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+
+# Общий для всех запросов сессии набор token bucket, отдельный бюджет на каждый адрес
+class RateLimiter:
+    def __init__(self, rate_limits: dict = None):
+        rate_limits = DEFAULT_RATE_LIMITS if rate_limits is None else rate_limits
+        self.buckets = {endpoint: TokenBucket(rate) for endpoint, rate in rate_limits.items()}
+
+    async def acquire(self, url: str):
+        for endpoint, bucket in self.buckets.items():
+            if endpoint in url:
+                await bucket.acquire()
+                return
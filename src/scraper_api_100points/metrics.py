@@ -0,0 +1,206 @@
+import bisect
+import json
+import math
+import re
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import aiohttp
+from yarl import URL
+
+# Границы корзин гистограмм, сек
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+HELP = {
+    'requests_total': 'HTTP-запросы по адресу и статусу ответа',
+    'request_errors_total': 'Запросы, завершившиеся исключением',
+    'response_bytes_total': 'Получено байт тела ответа',
+    'connections_created_total': 'Открыто новых соединений',
+    'connections_reused_total': 'Запросов на уже открытом соединении',
+    'redirects_total': 'Перенаправления',
+    'dns_seconds': 'Разрешение имени',
+    'connect_seconds': 'Установка соединения (TCP + TLS)',
+    'ttfb_seconds': 'От начала запроса до заголовков ответа',
+    'body_seconds': 'Чтение тела ответа',
+    'parse_seconds': 'Разбор HTML',
+    'rate_limit_wait_seconds': 'Ожидание token bucket',
+    'limiter_wait_seconds': 'Ожидание слота ограничителя параллельности',
+    'limiter_limit': 'Текущий лимит параллельности',
+    'limiter_overload_errors': 'Ответы 429/5xx и таймауты, снизившие лимит',
+    'retries_total': 'Повторные запросы',
+    'failed_attempts_total': 'Неудачные попытки запросов',
+    'failed_urls': 'Адреса, не загруженные после всех повторов',
+    'records': 'Собрано записей',
+    'cache_hits': 'Ответы из дискового кэша',
+    'cache_misses': 'Промахи дискового кэша',
+}
+
+
+def _number(value) -> str:
+    # {:g} оставляет 6 значащих цифр: 123456789 байт превращались в 1.23457e+08
+    value = float(value)
+    if math.isnan(value) or math.isinf(value):
+        return {'nan': 'NaN', 'inf': '+Inf', '-inf': '-Inf'}[str(value)]
+    if value.is_integer() and abs(value) < 2 ** 53:
+        return str(int(value))
+    return repr(value)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def endpoint(url) -> str:
+    # Номера в пути заменяются, чтобы у всех страниц заданий была одна метка
+    return re.sub(r'/\d+(?=/|$)', '/{id}', URL(str(url)).path) or '/'
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        # Линейная интерполяция внутри корзины, как histogram_quantile в Prometheus
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            if cumulative + count >= rank and count:
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.buckets[-1]
+
+    def to_dict(self) -> dict:
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'mean': self.sum / self.count if self.count else 0.0,
+            'p50': self.quantile(0.5),
+            'p90': self.quantile(0.9),
+            'p99': self.quantile(0.99),
+        }
+
+
+# Метрики прогона: тайминги фаз запроса из aiohttp TraceConfig, байты, разбор, ожидание ограничителей.
+# Метки -- кортеж пар (имя, значение), чтобы ключ был хэшируемым
+class ScrapeMetrics:
+    def __init__(self):
+        self.counters = defaultdict(float)
+        self.histograms = defaultdict(Histogram)
+        self.gauges = {}
+        self.started = time.time()
+
+    def inc(self, name: str, value: float = 1, **labels):
+        self.counters[name, tuple(sorted(labels.items()))] += value
+
+    def observe(self, name: str, value: float, **labels):
+        self.histograms[name, tuple(sorted(labels.items()))].observe(value)
+
+    def set_gauge(self, name: str, value: float, **labels):
+        self.gauges[name, tuple(sorted(labels.items()))] = value
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(self._on_request_start)
+        trace_config.on_dns_resolvehost_start.append(self._on_dns_start)
+        trace_config.on_dns_resolvehost_end.append(self._on_dns_end)
+        trace_config.on_connection_create_start.append(self._on_connection_start)
+        trace_config.on_connection_create_end.append(self._on_connection_end)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reuse)
+        trace_config.on_request_redirect.append(self._on_redirect)
+        trace_config.on_request_end.append(self._on_request_end)
+        trace_config.on_request_exception.append(self._on_request_exception)
+        trace_config.on_response_chunk_received.append(self._on_chunk)
+        return trace_config
+
+    async def _on_request_start(self, session, context, params):
+        context.start = time.perf_counter()
+        context.endpoint = endpoint(params.url)
+
+    async def _on_dns_start(self, session, context, params):
+        context.dns_start = time.perf_counter()
+
+    async def _on_dns_end(self, session, context, params):
+        self.observe('dns_seconds', time.perf_counter() - context.dns_start)
+
+    async def _on_connection_start(self, session, context, params):
+        context.connect_start = time.perf_counter()
+
+    async def _on_connection_end(self, session, context, params):
+        self.inc('connections_created_total')
+        self.observe('connect_seconds', time.perf_counter() - context.connect_start)
+
+    async def _on_connection_reuse(self, session, context, params):
+        self.inc('connections_reused_total')
+
+    async def _on_redirect(self, session, context, params):
+        self.inc('redirects_total', endpoint=context.endpoint, status=params.response.status)
+
+    async def _on_request_end(self, session, context, params):
+        # on_request_end приходит после заголовков ответа, тело читается позже
+        self.observe('ttfb_seconds', time.perf_counter() - context.start, endpoint=context.endpoint)
+        self.inc('requests_total', endpoint=context.endpoint, status=params.response.status)
+
+    async def _on_request_exception(self, session, context, params):
+        self.inc('request_errors_total', endpoint=context.endpoint, error=type(params.exception).__name__)
+
+    async def _on_chunk(self, session, context, params):
+        self.inc('response_bytes_total', len(params.chunk), endpoint=endpoint(params.url))
+
+    def to_json(self) -> dict:
+        metrics = defaultdict(list)
+        for values in (self.counters, self.gauges):
+            for (name, labels), value in values.items():
+                metrics[name].append({'labels': dict(labels), 'value': value})
+        for (name, labels), histogram in self.histograms.items():
+            metrics[name].append({'labels': dict(labels), **histogram.to_dict()})
+        return {'started': self.started, 'elapsed': time.time() - self.started,
+                'metrics': dict(sorted(metrics.items()))}
+
+    def to_prometheus(self, prefix: str = 'scraper_') -> str:
+        def format_labels(labels, extra=()):
+            pairs = [*labels, *extra]
+            if not pairs:
+                return ''
+            return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in pairs) + '}'
+
+        lines = []
+        for kind, metrics in (('counter', self.counters), ('gauge', self.gauges)):
+            for name in sorted({name for name, _ in metrics}):
+                lines += [f'# HELP {prefix}{name} {HELP.get(name, name)}', f'# TYPE {prefix}{name} {kind}']
+                lines += [f'{prefix}{name}{format_labels(labels)} {_number(value)}'
+                          for (metric, labels), value in sorted(metrics.items(), key=str) if metric == name]
+
+        for name in sorted({name for name, _ in self.histograms}):
+            lines += [f'# HELP {prefix}{name} {HELP.get(name, name)}', f'# TYPE {prefix}{name} histogram']
+            for (metric, labels), histogram in sorted(self.histograms.items(), key=lambda item: str(item[0])):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip((*histogram.buckets, '+Inf'), histogram.counts):
+                    cumulative += count
+                    lines.append(f'{prefix}{name}_bucket{format_labels(labels, [("le", bound)])} {cumulative}')
+                lines.append(f'{prefix}{name}_sum{format_labels(labels)} {_number(histogram.sum)}')
+                lines.append(f'{prefix}{name}_count{format_labels(labels)} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+    def save(self, path):
+        # path без расширения: рядом пишутся .json и .prom
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.with_suffix('.json').write_text(json.dumps(self.to_json(), ensure_ascii=False, indent=1),
+                                             encoding='utf-8')
+        path.with_suffix('.prom').write_text(self.to_prometheus(), encoding='utf-8')
+        print(f'[INFO] Метрики сохранены в {path.with_suffix(".json")} и {path.with_suffix(".prom")}')
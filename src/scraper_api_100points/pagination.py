@@ -0,0 +1,71 @@
+import asyncio
+import math
+
+# Без счетчика записей страницы запрашиваются наугад на столько вперед от последней непустой
+PREFETCH_PAGES = 4
+
+
+# Номера страниц списка для загрузчиков. Сначала известна только первая страница: по ее счетчику
+# "Записи с 1 до 15 из N" определяются размер страницы и их число, остальные страницы запрашиваются
+# параллельно. Первая пустая страница обрезает список, даже если счетчик обещал больше
+class PageCursor:
+    def __init__(self, done_pages=()):
+        # Первая страница загружается и при продолжении прогона: только из нее известно число страниц
+        self.done_pages = set(done_pages) - {1}
+        self.next_page = 1
+        self.end = 2
+        self.per_page = None
+        self.total = None
+        self.exhausted = False
+        self.in_flight = 0
+        self._changed = asyncio.Condition()
+
+    @property
+    def pages_count(self) -> int:
+        return self.end - 1
+
+    def _next(self):
+        while self.next_page < self.end and self.next_page in self.done_pages:
+            self.next_page += 1
+        if self.next_page >= self.end:
+            return None
+        self.next_page += 1
+        return self.next_page - 1
+
+    async def take(self):
+        # None -- страниц больше нет. Пока другие страницы загружаются, граница еще может сдвинуться
+        async with self._changed:
+            while True:
+                page_number = self._next()
+                if page_number is not None:
+                    self.in_flight += 1
+                    return page_number
+                if not self.in_flight:
+                    return None
+                await self._changed.wait()
+
+    async def done(self, page_number: int, rows, info):
+        # rows=None -- страница не загрузилась, о границе списка она ничего не говорит
+        async with self._changed:
+            self.in_flight -= 1
+            if rows is not None:
+                self._update(page_number, rows, info)
+            self._changed.notify_all()
+
+    def _update(self, page_number: int, rows, info):
+        if not rows:
+            self.exhausted = True
+            self.end = min(self.end, page_number)
+            return
+        if self.exhausted:
+            return
+
+        if info is not None and self.per_page is None:
+            first, last, _ = info
+            self.per_page = last - first + 1
+        if info is not None and self.per_page:
+            # Счетчик есть на каждой странице: если записей стало больше, граница сдвигается
+            self.total = info[2]
+            self.end = max(self.end, math.ceil(self.total / self.per_page) + 1)
+        else:
+            self.end = max(self.end, page_number + 1 + PREFETCH_PAGES)
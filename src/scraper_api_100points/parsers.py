@@ -0,0 +1,78 @@
+import hashlib
+import re
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from extractor import extract_homework
+
+
+# Функции разбора не зависят от WebScraper, чтобы их можно было выполнять в пуле процессов
+def parse_page_rows(html: str) -> list[tuple[str, str]]:
+    return parse_listing_page(html)[0]
+
+
+def parse_listing_page(html: str) -> tuple[list[tuple[str, str]], tuple]:
+    # Строки страницы списка и счетчик "Записи с 1 до 15 из 1187" за один разбор: (первая, последняя, всего)
+    # или None, если счетчика нет.
+    # Для каждой ссылки возвращается хэш текста строки таблицы: по нему видно, изменилась ли работа
+    only_links_in_wrapper = SoupStrainer(id='example2_wrapper')
+    soup = BeautifulSoup(html, 'lxml', parse_only=only_links_in_wrapper)
+    rows = []
+    for row in soup.select('tbody tr.odd'):
+        row_hash = hashlib.sha1(' '.join(row.stripped_strings).encode('utf-8')).hexdigest()
+        rows.extend((link.get('href'), row_hash) for link in row.select('a[href]'))
+
+    info = None
+    info_block = soup.find(id='example2_info')
+    numbers = re.findall(r'\d+', info_block.text) if info_block else []
+    if len(numbers) >= 3:
+        info = tuple(int(number) for number in numbers[-3:])
+    return rows, info
+
+
+def _extract_value(elem, attribute=None, regex=None, group=0):
+    try:
+        value = elem.text.strip()
+        if attribute:
+            value = elem.get(attribute)
+        elif regex:
+            value = re.search(regex, value).group(group)
+        return value
+    except AttributeError:
+        return None
+
+
+def parse_homework_page(html: str, url: str) -> dict:
+    return extract_homework(html, url)
+
+
+# Прежний разбор через BeautifulSoup, оставлен для сравнения в benchmarks/bench_extractor.py
+def parse_homework_page_soup(html: str, url: str) -> dict:
+    soup = BeautifulSoup(html, 'lxml')
+    rows = soup.find('div', class_='card-body').find('div', class_='row').find_all('div',
+                                                                                   class_='form-group col-md-3')
+
+    user = rows[0]
+    homework = rows[1].find_all('div')
+    status = rows[2]
+    datetime = rows[3].find_all('div')
+    score = rows[4].find_all('div')
+    result = rows[5].find_all('div')
+
+    return {
+        "href": url,
+        "user_email": _extract_value(user, regex=r'\S+@+\S+'),
+        "user_name": _extract_value(user.find('input', class_='form-control'), attribute='value'),
+        "vk_id": _extract_value(user.find_all('div')[1], regex=r'(\d+)'),
+        "lesson": _extract_value(homework[0], regex=r'Урок:\s*(.*)', group=1),
+        "module": _extract_value(homework[1], regex=r'Модуль:\s*(.*)', group=1),
+        "course": _extract_value(homework[2], regex=r'Курс:\s*(.*)', group=1),
+        "level": _extract_value(homework[3], regex=r'Сложность:\s*(.*)', group=1),
+        "status": _extract_value(status, regex=r'Статус\s*(.*)', group=1),
+        "submission_time": _extract_value(datetime[0], regex=r'\d+.\d+.\d+\s+\d+:\d+:\d+'),
+        "deadline_time": _extract_value(datetime[2], regex=r'\d+.\d+.\d+\s+\d+:\d+:\d+'),
+        "test_score": _extract_value(score[0], regex=r'\d+'),
+        "secondary_score": _extract_value(score[1], regex=r'\d+'),
+        "curator_score": _extract_value(score[2], regex=r'\d+'),
+        "result_score": _extract_value(result[0], regex=r'\d+%+\s+\d+/+\d+'),
+    }
@@ -0,0 +1,93 @@
+import cProfile
+import io
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+# Строки tracemalloc из самого профилировщика и импорта не интересны
+_MEMORY_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+)
+
+
+# Профилирование по этапам (--profile): на каждый этап свой cProfile и замер памяти через tracemalloc.
+# В папке профиля -- <номер>_<этап>.prof для snakeviz/pstats и общий summary.txt
+class StageProfiler:
+    def __init__(self, directory=None, top: int = 20):
+        self.directory = Path(directory) if directory else None
+        self.top = top
+        self.stages = []
+        self._active = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    @contextmanager
+    def stage(self, name: str):
+        # Вложенные и параллельные этапы (дочерние скреперы пакетного режима) входят во внешний этап
+        if not self.enabled or self._active is not None:
+            yield
+            return
+
+        self._active = name
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot().filter_traces(_MEMORY_FILTERS)
+        start_size, _ = tracemalloc.get_traced_memory()
+        profile = cProfile.Profile()
+        started = time.perf_counter()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            elapsed = time.perf_counter() - started
+            current_size, peak_size = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot().filter_traces(_MEMORY_FILTERS)
+            self._active = None
+            self._save(name, elapsed, profile, peak_size - start_size, current_size - start_size,
+                       after.compare_to(before, 'lineno')[:self.top])
+
+    def _save(self, name, elapsed, profile, peak, retained, memory_diff):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        profile_path = self.directory / f'{len(self.stages) + 1:02d}_{name}.prof'
+        profile.dump_stats(profile_path)
+
+        stream = io.StringIO()
+        pstats.Stats(profile, stream=stream).sort_stats('cumulative').print_stats(self.top)
+        self.stages.append({
+            'name': name,
+            'elapsed': elapsed,
+            'peak': peak,
+            'retained': retained,
+            'profile_path': profile_path,
+            'cpu': stream.getvalue(),
+            'memory': [str(diff) for diff in memory_diff],
+        })
+        # Сводка переписывается после каждого этапа, чтобы остаться и при падении прогона
+        self._write_summary()
+
+    def _write_summary(self):
+        lines = [f'{"stage":<14} {"time, s":>9} {"peak, MiB":>10} {"retained, MiB":>14}']
+        for stage in self.stages:
+            lines.append(f'{stage["name"]:<14} {stage["elapsed"]:9.2f} {stage["peak"] / 2 ** 20:10.1f} '
+                         f'{stage["retained"] / 2 ** 20:14.1f}')
+        for stage in self.stages:
+            lines += ['', '=' * 100, f'{stage["name"]}: {stage["profile_path"].name}', '',
+                      stage['cpu'].strip(), '', 'Память (рост по строкам):', *stage['memory']]
+        (self.directory / 'summary.txt').write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+    def finish(self):
+        if not self.enabled or not self.stages:
+            return
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        print(f'[INFO] Профиль сохранен в {self.directory}')
+        for stage in self.stages:
+            print(f'    {stage["name"]:<14} {stage["elapsed"]:8.2f} s, пик памяти {stage["peak"] / 2 ** 20:.1f} MiB')
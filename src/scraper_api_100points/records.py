@@ -0,0 +1,78 @@
+import sys
+from datetime import datetime
+
+# На странице время сдачи -- 25.02.2024 11:11:19, дедлайн -- 2024-02-24 23:59:00
+FIELD_TIME_FORMATS = {
+    'submission_time': '%d.%m.%Y %H:%M:%S',
+    'deadline_time': '%Y-%m-%d %H:%M:%S',
+}
+TIME_FORMATS = tuple(FIELD_TIME_FORMATS.values())
+# Уровни сложности в порядке столбцов сводной таблицы и аналитики
+LEVELS = ('Базовый', 'Средний', 'Сложный')
+INT_FIELDS = ('vk_id', 'test_score', 'secondary_score', 'curator_score')
+TIME_FIELDS = ('submission_time', 'deadline_time')
+# Значения повторяются во многих записях: курс, урок, ученик. Храним одну копию строки
+INTERNED_FIELDS = ('user_email', 'user_name', 'lesson', 'module', 'course', 'level', 'status')
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_datetime(value):
+    if value is None:
+        return None
+    for time_format in TIME_FORMATS:
+        try:
+            return datetime.strptime(value, time_format)
+        except ValueError:
+            continue
+    return None
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+# Запись о домашнем задании с уже приведенными типами; __slots__ вместо dict на каждую запись
+class HomeworkRecord:
+    __slots__ = ('href', 'user_email', 'user_name', 'vk_id', 'lesson', 'module', 'course', 'level', 'status',
+                 'submission_time', 'deadline_time', 'test_score', 'secondary_score', 'curator_score',
+                 'result_score')
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
+
+    @classmethod
+    def from_dict(cls, raw: dict) -> 'HomeworkRecord':
+        # raw -- словарь строк, как его возвращает extract_homework
+        record = cls.__new__(cls)
+        for name in cls.__slots__:
+            value = raw.get(name)
+            if name in INT_FIELDS:
+                value = _to_int(value)
+            elif name in TIME_FIELDS:
+                value = _to_datetime(value)
+            elif name in INTERNED_FIELDS:
+                value = _intern(value)
+            setattr(record, name, value)
+        return record
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def as_tuple(self) -> tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other):
+        return isinstance(other, HomeworkRecord) and self.as_tuple() == other.as_tuple()
+
+    def __repr__(self):
+        return f'HomeworkRecord({self.to_dict()!r})'
+
+
+FIELDS = HomeworkRecord.__slots__
@@ -0,0 +1,67 @@
+import asyncio
+import random
+from collections import Counter
+
+import aiohttp
+
+from limiter import RETRYABLE_STATUSES
+
+
+# Единая политика повторов для всех запросов WebScraper: экспоненциальная задержка с jitter
+# и общий бюджет повторов, который пополняется на budget_ratio с каждого нового запроса
+class RetryPolicy:
+    def __init__(self, max_attempts: int = 4, base_delay: float = 0.5, max_delay: float = 10.0,
+                 budget_ratio: float = 0.2, min_budget: int = 20, metrics=None):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget_ratio = budget_ratio
+        self.budget = float(min_budget)
+        self.retries = 0
+        self.failures = Counter()
+        self.failed_urls = set()
+        # Счетчики *_total в ScrapeMetrics: в режиме демона политика создается заново на каждый сбор,
+        # а счетчики Prometheus должны только расти
+        self.metrics = metrics
+
+    @staticmethod
+    def is_retryable(e: BaseException) -> bool:
+        if isinstance(e, aiohttp.ClientResponseError):
+            return e.status in RETRYABLE_STATUSES
+        return isinstance(e, (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError))
+
+    def _delay(self, attempt: int, e: BaseException) -> float:
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        retry_after = e.headers.get('Retry-After') if isinstance(e, aiohttp.ClientResponseError) and e.headers else None
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, min(self.max_delay, float(retry_after)))
+        return delay
+
+    async def run(self, url: str, request_func):
+        self.budget += self.budget_ratio
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return await request_func()
+            except Exception as e:
+                self.failures[url] += 1
+                if self.metrics:
+                    self.metrics.inc('failed_attempts_total')
+                if not self.is_retryable(e) or attempt >= self.max_attempts or self.budget < 1:
+                    self.failed_urls.add(url)
+                    raise
+                self.budget -= 1
+                self.retries += 1
+                if self.metrics:
+                    self.metrics.inc('retries_total')
+                await asyncio.sleep(self._delay(attempt, e))
+
+    def print_report(self, top: int = 10):
+        if not self.failures:
+            return
+        print(f"[WARNING] Повторов: {self.retries}, неудачных попыток: {sum(self.failures.values())}, "
+              f"не загружено адресов: {len(self.failed_urls)}")
+        for url, count in self.failures.most_common(top):
+            state = 'не загружен' if url in self.failed_urls else 'загружен после повтора'
+            print(f"    {count} x {url} ({state})")
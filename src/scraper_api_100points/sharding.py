@@ -0,0 +1,64 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from config import AppConfig_test
+from limiter import DEFAULT_RATE_LIMITS
+from web_scraper import WebScraper
+
+# Без выборок группа собирается целиком: все модули и уроки курса
+WHOLE_COURSE = [('', None)]
+
+
+def _scrape_shard(config_file: str, groups: list[tuple], selections: list[tuple], rate_limits: dict,
+                  use_cache: bool, parse_workers: int, queue_size: int) -> list[dict]:
+    return asyncio.run(_scrape_groups(config_file, groups, selections, rate_limits, use_cache, parse_workers,
+                                      queue_size))
+
+
+async def _scrape_groups(config_file, groups, selections, rate_limits, use_cache, parse_workers=0, queue_size=200):
+    config = AppConfig_test(config_file)
+    records = []
+    for course_id, group_id in groups:
+        scraper = WebScraper(config, queue_size=queue_size, rate_limits=rate_limits, use_cache=use_cache,
+                             journal_path=None, use_parse_executor=parse_workers > 0,
+                             parse_workers=parse_workers or None)
+        scraper.custom_params.update(course_id=course_id, group_id=group_id)
+        scraper.show_progress = False
+        await scraper.run_batch(selections or WHOLE_COURSE)
+        group_records = await scraper.get_data()
+        print(f"[INFO] Курс {course_id}, группа {group_id}: {len(group_records)} записей (pid {os.getpid()})")
+        records.extend(group_records)
+    return records
+
+
+async def _refresh_cookies(config_file: str):
+    # Авторизуемся один раз до запуска процессов: они берут cookies из общего файла и не логинятся сами
+    scraper = WebScraper(AppConfig_test(config_file), journal_path=None)
+    try:
+        await scraper._open()
+    finally:
+        await scraper.close_session()
+
+
+async def run_sharded(config_file: str, groups: list[tuple], selections: list[tuple] = None, workers: int = None,
+                      rate_limits: dict = None, use_cache: bool = True, parse_workers: int = 0,
+                      queue_size: int = 200) -> list[dict]:
+    workers = max(1, min(workers or os.cpu_count() or 1, len(groups)))
+    shards = [groups[index::workers] for index in range(workers)]
+    # Общий бюджет запросов делится между процессами
+    rate_limits = {endpoint: rate / workers for endpoint, rate in (rate_limits or DEFAULT_RATE_LIMITS).items()}
+    # Пул разбора создается в каждом процессе, поэтому процессы разбора тоже делятся
+    parse_workers = max(1, parse_workers // workers) if parse_workers else 0
+    print(f"[INFO] Групп: {len(groups)}, процессов: {workers}")
+
+    await _refresh_cookies(config_file)
+
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        shard_records = await asyncio.gather(*(
+            loop.run_in_executor(executor, _scrape_shard, config_file, shard, selections, rate_limits, use_cache,
+                                 parse_workers, queue_size)
+            for shard in shards
+        ))
+    return [record for records in shard_records for record in records]
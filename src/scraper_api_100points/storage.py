@@ -0,0 +1,67 @@
+import hashlib
+import json
+import sqlite3
+from datetime import datetime
+
+
+# Локальное хранилище записей о домашних заданиях для инкрементального режима, ключ -- href.
+# Записи фиксируются пачками по commit_every: при падении прогона теряется не больше одной пачки,
+# а транзакция записи не держит файл заблокированным для других процессов (например, в режиме демона)
+class HomeworkStore:
+    def __init__(self, path: str = 'homeworks.sqlite', commit_every: int = 100):
+        self.path = path
+        self.commit_every = commit_every
+        self.uncommitted = 0
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('''
+            CREATE TABLE IF NOT EXISTS homeworks (
+                href TEXT PRIMARY KEY,
+                row_hash TEXT,
+                content_hash TEXT NOT NULL,
+                record TEXT NOT NULL,
+                last_seen TEXT NOT NULL
+            )
+        ''')
+
+    @staticmethod
+    def content_hash(record: dict) -> str:
+        return hashlib.sha1(json.dumps(record, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+    def is_fresh(self, href: str, row_hash: str) -> bool:
+        # Работа не требует повторной загрузки, если строка в списке не изменилась с прошлого раза
+        if row_hash is None:
+            return False
+        row = self.connection.execute('SELECT row_hash FROM homeworks WHERE href = ?', (href,)).fetchone()
+        return row is not None and row[0] == row_hash
+
+    def save(self, record: dict, row_hash: str = None):
+        self.connection.execute(
+            'INSERT OR REPLACE INTO homeworks (href, row_hash, content_hash, record, last_seen) VALUES (?, ?, ?, ?, ?)',
+            (record['href'], row_hash, self.content_hash(record), json.dumps(record, ensure_ascii=False),
+             datetime.now().isoformat(timespec='seconds'))
+        )
+        self.uncommitted += 1
+        if self.uncommitted >= self.commit_every:
+            self.commit()
+
+    def touch(self, hrefs: list[str]):
+        now = datetime.now().isoformat(timespec='seconds')
+        self.connection.executemany('UPDATE homeworks SET last_seen = ? WHERE href = ?',
+                                    [(now, href) for href in hrefs])
+        self.commit()
+
+    def get_records(self, hrefs: list[str]) -> list[dict]:
+        records = []
+        for href in hrefs:
+            row = self.connection.execute('SELECT record FROM homeworks WHERE href = ?', (href,)).fetchone()
+            if row is not None:
+                records.append(json.loads(row[0]))
+        return records
+
+    def commit(self):
+        self.connection.commit()
+        self.uncommitted = 0
+
+    def close(self):
+        self.commit()
+        self.connection.close()
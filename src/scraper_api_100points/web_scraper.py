@@ -1,25 +1,65 @@
 import aiohttp
 import asyncio
+import copy
 import ssl
 import certifi
-import re
 import os
 import sys
+import time
 
 from aiohttp import ClientSession
-from bs4 import BeautifulSoup, SoupStrainer
-from pickle import load, dump
-from prettytable import PrettyTable
+from concurrent.futures import ProcessPoolExecutor
+from bs4 import BeautifulSoup
 from tqdm import tqdm
+from yarl import URL
+
+from exceptions import AuthenticationError, SessionExpiredError
+from config import AppConfig, ALL_LESSONS
+from parsers import parse_homework_page, parse_listing_page
+from storage import HomeworkStore
+from cache import ResponseCache, full_url
+from limiter import AdaptiveLimiter, RateLimiter
+from retry import RetryPolicy
+from journal import ScrapeJournal
+from pagination import PageCursor
+from cookie_store import CookieStore
+from records import FIELDS, HomeworkRecord
+from metrics import ScrapeMetrics, endpoint
+from profiling import StageProfiler
+
+BASE_URL = 'https://api.100points.ru'
+# 401 -- нет авторизации, 419 -- в Laravel истек CSRF-токен сессии
+SESSION_EXPIRED_STATUSES = {401, 419}
+MAX_REAUTH_PER_REQUEST = 2
+
+
+# Общая для родителя и дочерних скреперов пауза запросов на время повторной авторизации.
+# generation растет после каждого повторного входа: по нему видно, что запрос ушел еще со старыми cookies
+class AuthGate:
+    def __init__(self):
+        self.ready = asyncio.Event()
+        self.ready.set()
+        self.generation = 0
+        # Ошибка неудачного повторного входа: остальные запросы падают с ней же, а не логинятся заново
+        self.error = None
+
+    async def wait(self):
+        await self.ready.wait()
+        if self.error is not None:
+            raise self.error
 
-from exceptions import AuthenticationError
-from config import AppConfig
 
 class WebScraper:
     session: ClientSession
 
-    def __init__(self, config: AppConfig, connections_limit: int = 50):
+    def __init__(self, config: AppConfig, connections_limit: int = 50, queue_size: int = 200,
+                 use_parse_executor: bool = False, parse_workers: int = None,
+                 incremental: bool = False, store_path: str = 'homeworks.sqlite',
+                 use_cache: bool = True, cache_dir: str = '.http_cache', rate_limits: dict = None,
+                 resume: bool = False, journal_path: str = 'scrape_journal.jsonl', base_url: str = BASE_URL,
+                 collect_metrics: bool = False, profiler: StageProfiler = None):
         self.config = config
+        self.base_url = base_url
         self.custom_params = {
             'status': 'passed',
             'course_id': self.config.course_id,
@@ -28,7 +68,35 @@ class WebScraper:
         self.session = None
         self.data = []
         self.task_number = 0
-        self.semaphore = asyncio.Semaphore(connections_limit)
+        self.connections_limit = connections_limit
+        # Параллельность подбирается автоматически в пределах connections_limit
+        self.limiter = AdaptiveLimiter(initial_limit=min(10, connections_limit), max_limit=connections_limit)
+        self.rate_limiter = RateLimiter(rate_limits)
+        # Тайминги запросов, байты, разбор и ожидание ограничителей (--metrics)
+        self.metrics = ScrapeMetrics() if collect_metrics else None
+        self.retry_policy = RetryPolicy(metrics=self.metrics)
+        # Журнал для продолжения прерванного прогона (--resume)
+        self.resume = resume
+        self.journal = ScrapeJournal(journal_path)
+        self.show_progress = True
+        # Глубина очереди ссылок между сбором страниц и загрузкой домашних заданий
+        self.queue_size = queue_size
+        # Разбор HTML в отдельных процессах, чтобы event loop занимался только сетью
+        self.use_parse_executor = use_parse_executor
+        self.parse_workers = parse_workers or os.cpu_count() or 1
+        self.parse_executor = None
+        # Инкрементальный режим: повторно загружаются только новые и изменившиеся работы
+        self.incremental = incremental
+        self.store_path = store_path
+        self.store = None
+        self.unchanged_urls = []
+        # Кэш страниц списка и фильтров между запусками
+        self.cache = ResponseCache(cache_dir, namespace=self.config.email) if use_cache else None
+        # Cookies сессии общие для всех процессов с этим email
+        self.cookie_store = CookieStore(f'{self.config.email}.cookies.json')
+        self.auth_gate = AuthGate()
+        # Профиль по этапам (--profile); по умолчанию выключен
+        self.profiler = profiler or StageProfiler()
 
     async def _create_session(self):
         headers = {
@@ -38,21 +106,29 @@ class WebScraper:
         ssl_context = ssl.create_default_context(cafile=certifi.where())
         connector = aiohttp.TCPConnector(ssl=ssl_context)
 
-        session = aiohttp.ClientSession(headers=headers, connector=connector)
+        trace_configs = [self.metrics.trace_config()] if self.metrics else None
+        session = aiohttp.ClientSession(headers=headers, connector=connector, trace_configs=trace_configs)
 
         self.session = session
 
     async def _authenticate(self):
 
         print("[INFO] Попытка авторизации через cookies.")
-        await self.load_session_cookies()
-        if await self.is_auth():
+        if await self.load_session_cookies() and await self.is_auth():
             print("[INFO] Успешная аутентификация через cookies.")
             return
 
+        # Логинится только один процесс, остальные ждут замок и берут сохраненные им cookies
+        async with self.cookie_store.lock():
+            if await self.load_session_cookies() and await self.is_auth():
+                print("[INFO] Успешная аутентификация через cookies, обновленные другим процессом.")
+                return
+            await self._login()
+
+    async def _login(self):
         print("[INFO] Попытка авторизации через логин/пароль")
         try:
-            async with self.session.get('https://api.100points.ru/login') as response:
+            async with self.session.get(f'{self.base_url}/login') as response:
                 html = await response.text()
 
             soup = BeautifulSoup(html, 'lxml')
@@ -66,7 +142,7 @@ class WebScraper:
             }
 
 
-            async with self.session.post('https://api.100points.ru/login', data=data) as response:
+            async with self.session.post(f'{self.base_url}/login', data=data) as response:
                 response.raise_for_status()
 
                 if await self.is_auth():
@@ -80,16 +156,17 @@ class WebScraper:
                         data=data
                     )
 
-        except AuthenticationError as e:
-            print(f"[ERROR] Authentication failed. Exception {e.message}")
-            sys.exit(1)
+        except AuthenticationError:
+            raise
 
         except Exception as e:
-            print(f"[ERROR] Authentication failed. Exception {e}")
-            sys.exit(1)
+            # Сетевые ошибки входа приводятся к AuthenticationError: при запуске она завершает программу,
+            # а во время сбора -- прерывает прогон с обычным закрытием сессии, журнала и хранилища
+            raise AuthenticationError(status_code=None, message=f'Login request failed: {e}',
+                                      url=f'{self.base_url}/login') from e
 
     async def is_auth(self):
-        async with self.session.get('https://api.100points.ru/myself', allow_redirects=False) as response:
+        async with self.session.get(f'{self.base_url}/myself', allow_redirects=False) as response:
             if response.status == 200:
                 return True
         return False
@@ -98,49 +175,43 @@ class WebScraper:
         if self.session:
             await self.session.close()
             print("[INFO] Сессия закрыта.")
+        if self.parse_executor:
+            self.parse_executor.shutdown(cancel_futures=True)
+            self.parse_executor = None
+        if self.store:
+            self.store.close()
+            self.store = None
+        self.journal.close()
+
+    def _create_parse_executor(self):
+        if self.use_parse_executor and self.parse_executor is None:
+            self.parse_executor = ProcessPoolExecutor(max_workers=self.parse_workers)
 
     async def save_session_cookies(self):
-        cookies = self.session.cookie_jar.filter_cookies('https://api.100points.ru/myself')
-        if not cookies:
-            print("['WARNING'] cookies not saved")
-            return
-        filename = f'{self.config.email}.pkl'
-        with open(filename, 'wb') as f:
-            dump(cookies, f)
-
-
-    async def load_session_cookies(self):
         try:
-            filename = f'{self.config.email}.pkl'
-            with open(filename, 'rb') as f:
-                cookies = load(f)
-                self.session.cookie_jar.update_cookies(cookies)
-        except FileNotFoundError:
-            print(f'[WARNING] cookies file not found')
-        except Exception as e:
-            print(f'[ERROR] Could not load cookies. Exception {e}')
-
-    async def _fetch_filter_options(self, filter: str) -> list[dict]:
-        filter_selection = None
-        max_retries = 5
-        retry_interval = 0.5
-
-        for attempt in range(max_retries):
-            try:
-                async with self.session.get('https://api.100points.ru/student_homework/index',
-                                            params=self.custom_params) as response:
-                    response.raise_for_status()
-                    soup = BeautifulSoup(await response.text(), "lxml")
-                    filter_selection = soup.select(f'select.form-control#{filter} option')
-                    break
-
-            except aiohttp.ClientError as e:
-                print(f"[ERROR] Page not found {response.url} Exception: {e}")
+            if not self.cookie_store.save(self.session.cookie_jar):
+                print("[WARNING] cookies not saved")
+        except OSError as e:
+            print(f'[ERROR] Could not save cookies. Exception {e}')
+
+    async def load_session_cookies(self) -> bool:
+        cookies = self.cookie_store.load()
+        if cookies is None:
+            print(f'[WARNING] no valid cookies in {self.cookie_store.path}')
+            return False
+        self.session.cookie_jar.update_cookies(cookies, response_url=URL(self.base_url))
+        return True
+
+    async def _fetch_filter_options(self, filter: str, params: dict = None) -> list[dict]:
+        filter_selection = []
+        url = f'{self.base_url}/student_homework/index'
+        params = params or self.custom_params
 
-            await asyncio.sleep(retry_interval)
-
-        else:
-            print(f"[ERROR] Page not found after {max_retries} attempts. {response.url} ")
+        try:
+            soup = BeautifulSoup(await self._get_html(url, params=params), "lxml")
+            filter_selection = soup.select(f'select.form-control#{filter} option')
+        except aiohttp.ClientError as e:
+            print(f"[ERROR] Page not found {full_url(url, params)} Exception: {e}")
 
         if not filter_selection:
             print(f"[ERROR] Filter {filter} not found")
@@ -173,99 +244,123 @@ class WebScraper:
 
         self.custom_params[filter] = param
 
-    async def _get_pages_count(self) -> int:
-        async with self.semaphore:
-            async with self.session.get(url='https://api.100points.ru/student_homework/index',
-                                        params=self.custom_params) as response:
-                print(f"[INFO] Итоговый запрос: {response.url}")
-                html = await response.text()
+    async def _get_html(self, url: str, params: dict = None) -> str:
+        if self.cache:
+            html = self.cache.get(url, params)
+            if html is not None:
+                return html
 
-        soup = BeautifulSoup(html, 'lxml')
-        pages_count = 0
-        try:
-            expected_block = soup.find('div', id="example2_info")
+        html = await self.retry_policy.run(full_url(url, params), lambda: self._request_with_reauth(url, params))
 
-            if expected_block:
-                expected = int(re.search(r'\d*$', expected_block.text.strip()).group())
-                pages_count = (expected // 15)
-                print("\n[INFO] Найдено ", expected, f" записи. Ожидается {pages_count} страниц(ы)")
-        except ValueError as e:
-            print(f"\n[ERROR] pagination not found. Exception {e}")
+        if self.cache:
+            self.cache.set(url, params, html)
+        return html
 
-        return pages_count
+    async def _request_with_reauth(self, url: str, params: dict = None) -> str:
+        # На каждое истечение сессии -- один вход и повтор запроса. Запрос может дождаться и следующего
+        # истечения, но если сессия не работает сразу после входа, повторять бесполезно
+        for _ in range(MAX_REAUTH_PER_REQUEST):
+            try:
+                return await self._request_html(url, params)
+            except SessionExpiredError as e:
+                await self._reauthenticate(e.generation)
+        return await self._request_html(url, params)
+
+    async def _reauthenticate(self, generation: int):
+        gate = self.auth_gate
+        if generation != gate.generation or not gate.ready.is_set():
+            # Вход уже выполнен или выполняется другим запросом, ждем его и повторяем запрос
+            await gate.wait()
+            return
+
+        gate.ready.clear()
+        try:
+            print("\n[WARNING] Сессия истекла во время сбора, повторная авторизация")
+            self.session.cookie_jar.clear()
+            await self._authenticate()
+            gate.generation += 1
+        except AuthenticationError as e:
+            print(f"\n[ERROR] Повторная авторизация не удалась, сбор прерван. Exception {e.message}")
+            gate.error = e
+            raise
+        finally:
+            gate.ready.set()
+
+    def _is_session_expired(self, response) -> bool:
+        return response.status in SESSION_EXPIRED_STATUSES or response.url.path.rstrip('/') == '/login'
+
+    async def _request_html(self, url: str, params: dict = None) -> str:
+        started = time.perf_counter()
+        await self.rate_limiter.acquire(url)
+        waited = time.perf_counter()
+        async with self.limiter.slot():
+            acquired = time.perf_counter()
+            # Пока идет повторная авторизация, запросы не отправляются. Вход идет мимо ограничителя,
+            # поэтому ожидание с занятым слотом не блокирует его
+            await self.auth_gate.wait()
+            generation = self.auth_gate.generation
+            async with self.session.get(url=url, params=params) as response:
+                if self._is_session_expired(response):
+                    raise SessionExpiredError(response.url, generation)
+                response.raise_for_status()
+                headers_received = time.perf_counter()
+                html = await response.text()
+                body_received = time.perf_counter()
+
+        if self.metrics:
+            label = endpoint(url)
+            self.metrics.observe('rate_limit_wait_seconds', waited - started, endpoint=label)
+            self.metrics.observe('limiter_wait_seconds', acquired - waited, endpoint=label)
+            self.metrics.observe('body_seconds', body_received - headers_received, endpoint=label)
+        return html
+
+    async def _parse(self, parse_func, *args):
+        started = time.perf_counter()
+        if self.parse_executor is None:
+            result = parse_func(*args)
+        else:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self.parse_executor, parse_func, *args)
+        if self.metrics:
+            # В пуле процессов сюда входит и передача данных между процессами
+            self.metrics.observe('parse_seconds', time.perf_counter() - started, parser=parse_func.__name__)
+        return result
 
     async def _get_page_data(self, page_number: int):
+        # Строки и счетчик записей страницы или None, если страница не загрузилась
+        url = f'{self.base_url}/student_homework/index'
         page_params = {**self.custom_params, 'page': page_number}
 
-        async with self.semaphore:
-            try:
-                async with self.session.get(url='https://api.100points.ru/student_homework/index',
-                                            params=page_params) as response:
-                    html = await response.text()
-            except Exception as e:
-                print(f'[ERROR] Page {page_number} canceled. Exception {e}')
-                return None
-
-        only_links_in_wrapper = SoupStrainer(id='example2_wrapper')
-        soup = BeautifulSoup(html, 'lxml', parse_only=only_links_in_wrapper)
-        homework_links = [link.get('href') for link in soup.select('tbody tr.odd a[href]')]
-        if not homework_links:
-            print(f'[ERROR] No homeworks found. Check {response.url}')
-            return None
-        return homework_links
-
-    @staticmethod
-    def _extract_value(elem, attribute=None, regex=None, group=0):
         try:
-            value = elem.text.strip()
-            if attribute:
-                value = elem.get(attribute)
-            elif regex:
-                value = re.search(regex, value).group(group)
-            return value
-        except AttributeError:
+            html = await self._get_html(url, params=page_params)
+        except AuthenticationError:
+            raise
+        except Exception as e:
+            print(f'[ERROR] Page {page_number} canceled. Exception {e}')
             return None
 
-    async def _get_homework_data(self, url):
+        homework_rows, info = await self._parse(parse_listing_page, html)
+        if page_number == 1 and not homework_rows:
+            print(f'[WARNING] No homeworks found. Check {full_url(url, page_params)}')
+        return homework_rows, info
+
+    async def _get_homework_data(self, url, row_hash=None):
         number = self.task_number
         self.task_number += 1
 
-        async with self.semaphore:
-            try:
-                async with self.session.get(url=url) as response:
-                    html = await response.text()
-            except Exception as e:
-                print(f'[ERROR] task {number} canceled. Exception {e}')
-                return None
-        soup = BeautifulSoup(html, 'lxml')
-        rows = soup.find('div', class_='card-body').find('div', class_='row').find_all('div',
-                                                                                       class_='form-group col-md-3')
-
-        user = rows[0]
-        homework = rows[1].find_all('div')
-        status = rows[2]
-        datetime = rows[3].find_all('div')
-        score = rows[4].find_all('div')
-        result = rows[5].find_all('div')
-
-        data_dict = {
-            "href": url,
-            "user_email": self._extract_value(user, regex=r'\S+@+\S+'),
-            "user_name": self._extract_value(user.find('input', class_='form-control'), attribute='value'),
-            "vk_id": self._extract_value(user.find_all('div')[1], regex=r'(\d+)'),
-            "lesson": self._extract_value(homework[0], regex=r'Урок:\s*(.*)', group=1),
-            "module": self._extract_value(homework[1], regex=r'Модуль:\s*(.*)', group=1),
-            "course": self._extract_value(homework[2], regex=r'Курс:\s*(.*)', group=1),
-            "level": self._extract_value(homework[3], regex=r'Сложность:\s*(.*)', group=1),
-            "status": self._extract_value(status, regex=r'Статус\s*(.*)', group=1),
-            "submission_time": self._extract_value(datetime[0], regex=r'\d+.\d+.\d+\s+\d+:\d+:\d+'),
-            "deadline_time": self._extract_value(datetime[2], regex=r'\d+.\d+.\d+\s+\d+:\d+:\d+'),
-            "test_score": self._extract_value(score[0], regex=r'\d+'),
-            "secondary_score": self._extract_value(score[1], regex=r'\d+'),
-            "curator_score": self._extract_value(score[2], regex=r'\d+'),
-            "result_score": self._extract_value(result[0], regex=r'\d+%+\s+\d+/+\d+'),
-        }
-        self.data.append(data_dict)
+        try:
+            html = await self._get_html(url)
+        except AuthenticationError:
+            raise
+        except Exception as e:
+            print(f'[ERROR] task {number} canceled. Exception {e}')
+            return None
+
+        data_dict = await self._parse(parse_homework_page, html, url)
+        self.data.append(HomeworkRecord.from_dict(data_dict))
+        self.journal.record(data_dict)
+        if self.store:
+            self.store.save(data_dict, row_hash)
 
     async def get_data(self):
         return self.data
@@ -276,46 +371,169 @@ class WebScraper:
     async def get_lesson(self):
         return self.custom_params['lesson_id'] or 0
     async def print_table(self):
+        from prettytable import PrettyTable
+
         if len(self.data) == 0:
             print('[WARNING] data is empty')
-        fields = list(self.data[0].keys())
-        table = PrettyTable(fields)
+        table = PrettyTable(FIELDS)
         for entry in self.data:
-            table.add_row([entry[field] for field in fields])
+            table.add_row(entry.as_tuple())
 
         print(table)
 
-    async def _run_tasks_with_progress(self, task_generator, desc):
-        if task_generator is None:
-            return None
-
-        tasks = list(task_generator)
-        with tqdm(total=len(tasks), desc=desc) as progress_bar:
-            return await asyncio.gather(*[self._progress_wrapper(task, progress_bar) for task in tasks])
-
-    async def _progress_wrapper(self, task, progress_bar):
-        result = await task
-        progress_bar.update(1)
-        return result
+    async def _links_worker(self, cursor: PageCursor, links_queue: asyncio.Queue,
+                            links_bar: tqdm, homeworks_bar: tqdm):
+        while True:
+            page_number = await cursor.take()
+            if page_number is None:
+                return
+
+            page_rows, info = await self._get_page_data(page_number) or (None, None)
+            await cursor.done(page_number, page_rows, info)
+            if page_number == 1 and cursor.total is not None:
+                print(f"\n[INFO] Найдено {cursor.total} записи. Ожидается {cursor.pages_count} страниц(ы)")
+            links_bar.total = max(cursor.pages_count, links_bar.n + 1)
+            links_bar.update(1)
+            # Строки первой страницы при продолжении прогона уже есть в журнале
+            if not page_rows or page_number in self.journal.pages:
+                continue
+
+            self.journal.page(page_number, page_rows)
+            await self._put_rows(page_rows, links_queue, homeworks_bar)
+
+    async def _put_rows(self, page_rows, links_queue: asyncio.Queue, homeworks_bar: tqdm):
+        if self.incremental:
+            page_rows = self._skip_unchanged(page_rows)
+
+        homeworks_bar.total = (homeworks_bar.total or 0) + len(page_rows)
+        homeworks_bar.refresh()
+        for url, row_hash in page_rows:
+            # Блокируется, пока очередь заполнена: загрузка страниц не убегает вперед
+            await links_queue.put((url, row_hash))
+
+    def _skip_unchanged(self, page_rows):
+        changed_rows = []
+        for url, row_hash in page_rows:
+            if self.store.is_fresh(url, row_hash):
+                self.unchanged_urls.append(url)
+            else:
+                changed_rows.append((url, row_hash))
+        return changed_rows
 
-    async def run_scraping(self):
-        try:
+    async def _homeworks_worker(self, links_queue: asyncio.Queue, homeworks_bar: tqdm):
+        while True:
+            item = await links_queue.get()
+            try:
+                if item is None:
+                    return
+                url, row_hash = item
+                await self._get_homework_data(url, row_hash)
+            except AuthenticationError:
+                raise
+            except Exception as e:
+                print(f'[ERROR] Homework {item[0]} not processed. Exception {e}')
+            finally:
+                links_queue.task_done()
+            homeworks_bar.update(1)
+
+    async def _run_pipeline(self, done_pages=(), pending_rows=()):
+        # Число страниц заранее не запрашивается: его дает счетчик на первой странице списка
+        cursor = PageCursor(done_pages)
+        links_queue = asyncio.Queue(maxsize=self.queue_size)
+
+        with tqdm(total=None, desc="Getting links", position=0, disable=not self.show_progress) as links_bar, \
+                tqdm(total=0, desc="Getting homeworks", position=1, disable=not self.show_progress) as homeworks_bar:
+            consumers = [asyncio.create_task(self._homeworks_worker(links_queue, homeworks_bar))
+                         for _ in range(self.connections_limit)]
+            producers = [asyncio.create_task(self._links_worker(cursor, links_queue, links_bar, homeworks_bar))
+                         for _ in range(self.connections_limit)]
+            links_bar.update(len(cursor.done_pages))
+            if pending_rows:
+                producers.append(asyncio.create_task(self._put_rows(pending_rows, links_queue, homeworks_bar)))
+
+            async def feed():
+                await asyncio.gather(*producers)
+                for _ in consumers:
+                    await links_queue.put(None)
+
+            tasks = [asyncio.create_task(feed()), *consumers]
+            try:
+                # Ошибка любого загрузчика (неудачный повторный вход) прерывает весь конвейер
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+                for task in done:
+                    task.result()
+            finally:
+                for task in tasks + producers:
+                    task.cancel()
+
+    def print_limiter_stats(self):
+        latency = ', '.join(f'{name} {value * 1000:.0f} ms' for name, value in self.limiter.percentiles().items())
+        print(f"[INFO] Параллельность: {self.limiter.limit} (макс. {self.connections_limit}), "
+              f"ошибок перегрузки: {self.limiter.errors}, задержка: {latency}")
+
+    def update_metrics_gauges(self):
+        self.metrics.set_gauge('limiter_limit', self.limiter.limit)
+        self.metrics.set_gauge('limiter_overload_errors', self.limiter.errors)
+        self.metrics.set_gauge('failed_urls', len(self.retry_policy.failed_urls))
+        self.metrics.set_gauge('records', len(self.data))
+        if self.cache:
+            self.metrics.set_gauge('cache_hits', self.cache.hits)
+            self.metrics.set_gauge('cache_misses', self.cache.misses)
+
+    def save_metrics(self, path):
+        if self.metrics is None:
+            return
+        self.update_metrics_gauges()
+        self.metrics.save(path)
+
+    def _merge_stored_records(self):
+        stored_records = self.store.get_records(self.unchanged_urls)
+        self.store.touch(self.unchanged_urls)
+        print(f"[INFO] Загружено {len(self.data)} новых/измененных работ, "
+              f"{len(stored_records)} взято из {self.store_path}")
+        self.data.extend(HomeworkRecord.from_dict(record) for record in stored_records)
+
+    async def _open(self):
+        with self.profiler.stage('auth'):
             await self._create_session()
+            self._create_parse_executor()
+            if self.incremental:
+                self.store = HomeworkStore(self.store_path)
             if await self.is_auth() is False:
-                await self._authenticate()
-
-            await self.set_custom_params_by_filter(filter='module_id')
-            await self.set_custom_params_by_filter(filter='lesson_id')
+                try:
+                    await self._authenticate()
+                except AuthenticationError as e:
+                    print(f"[ERROR] Authentication failed. Exception {e.message}")
+                    sys.exit(1)
+
+    async def _scrape(self):
+        print(f"[INFO] Итоговый запрос: {full_url(f'{self.base_url}/student_homework/index', self.custom_params)}")
+        with self.profiler.stage('details'):
+            await self._run_pipeline(done_pages=self.journal.pages.keys(), pending_rows=self.journal.pending_rows())
+        self.journal.finish()
+        if self.incremental:
+            self._merge_stored_records()
 
-            task_generator = (
-                self._get_page_data(page_number) for page_number in range(1, await self._get_pages_count() + 2)
-            )
-            all_homework_urls = await self._run_tasks_with_progress(task_generator, "Getting links")
+    async def run_scraping(self):
+        try:
+            await self._open()
+
+            if self.resume and self.journal.load():
+                # Выборка берется из журнала, повторно выбирать модуль и урок не нужно
+                self.custom_params = self.journal.params
+                self.data.extend(HomeworkRecord.from_dict(record) for record in self.journal.records.values())
+                print(f"[INFO] Продолжение прогона из {self.journal.path}: страниц {len(self.journal.pages)}, "
+                      f"записей {len(self.journal.records)}")
+                self.journal.start(self.custom_params, resume=True)
+            else:
+                with self.profiler.stage('filters'):
+                    await self.set_custom_params_by_filter(filter='module_id')
+                    await self.set_custom_params_by_filter(filter='lesson_id')
+                self.journal.start(self.custom_params)
 
-            task_generator = (
-                self._get_homework_data(url) for page_urls in all_homework_urls if page_urls is not None for url in page_urls
-            )
-            await self._run_tasks_with_progress(task_generator, "Getting homeworks")
+            await self._scrape()
+            self.print_limiter_stats()
+            self.retry_policy.print_report()
 
 
             if self.config.show_homeworks_in_the_terminal:
@@ -328,9 +546,61 @@ class WebScraper:
         finally:
             await self.close_session()
 
+    async def _expand_selections(self, selections: list[tuple]) -> list[dict]:
+        params_list = []
+        for module_id, lesson_id in selections:
+            if lesson_id != ALL_LESSONS:
+                params_list.append({**self.custom_params, 'module_id': module_id, 'lesson_id': lesson_id or ''})
+                continue
+
+            module_params = {**self.custom_params, 'module_id': module_id, 'lesson_id': ''}
+            lessons = await self._fetch_filter_options(filter='lesson_id', params=module_params)
+            params_list.extend({**module_params, 'lesson_id': option['lesson_id']}
+                               for option in lessons if option['lesson_id'] is not None)
+        return params_list
+
+    def _spawn(self, params: dict) -> 'WebScraper':
+        # Дочерний скрепер использует сессию, ограничители, кэш и пул разбора родителя
+        child = copy.copy(self)
+        child.custom_params = params
+        child.data = []
+        child.unchanged_urls = []
+        child.journal = ScrapeJournal(None)
+        child.show_progress = False
+        return child
+
+    async def scrape_batch(self, selections: list[tuple]) -> list['WebScraper']:
+        # Сессия должна быть уже открыта (_open); используется и в run_batch, и в режиме демона
+        with self.profiler.stage('filters'):
+            params_list = await self._expand_selections(selections)
+        print(f"[INFO] Пакетный режим: {len(params_list)} выборок(и)")
+        scrapers = [self._spawn(params) for params in params_list]
+
+        with tqdm(total=len(scrapers), desc="Selections", disable=not self.show_progress) as progress_bar:
+            async def scrape(scraper):
+                await scraper._scrape()
+                progress_bar.update(1)
+
+            # Этапы дочерних скреперов идут параллельно и попадают в общий этап
+            with self.profiler.stage('scraping'):
+                await asyncio.gather(*(scrape(scraper) for scraper in scrapers))
+
+        self.data = [record for scraper in scrapers for record in scraper.data]
+        self.print_limiter_stats()
+        self.retry_policy.print_report()
+        return scrapers
+
+    async def run_batch(self, selections: list[tuple]) -> list['WebScraper']:
+        # Неинтерактивный режим: все выборки собираются параллельно в одной авторизованной сессии
+        scrapers = []
+        try:
+            await self._open()
+            scrapers = await self.scrape_batch(selections)
 
+        except Exception as e:
+            print(e)
 
+        finally:
+            await self.close_session()
 
-
-
-
+        return scrapers
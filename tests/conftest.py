@@ -0,0 +1,9 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Модули скрепера импортируются плоско, как при запуске из src/scraper_api_100points;
+# фейковый сервер 100points и проверка запуска берутся из benchmarks
+sys.path.insert(0, str(ROOT / 'src' / 'scraper_api_100points'))
+sys.path.insert(0, str(ROOT / 'benchmarks'))
@@ -0,0 +1,60 @@
+import os
+import shutil
+
+from cache import ResponseCache
+
+URL = 'https://api.100points.ru/student_homework/index'
+
+
+def test_round_trip_and_pid_temp_file(tmp_path, monkeypatch):
+    cache = ResponseCache(tmp_path / 'cache')
+    replaced = []
+    real_replace = os.replace
+    monkeypatch.setattr(os, 'replace', lambda src, dst: (replaced.append(str(src)), real_replace(src, dst)))
+
+    cache.set(URL, {'page': 1}, '<html>1</html>')
+    assert cache.get(URL, {'page': 1}) == '<html>1</html>'
+    assert str(os.getpid()) in replaced[0]
+
+
+def test_eviction_keeps_size_under_limit_without_rescanning(tmp_path, monkeypatch):
+    cache = ResponseCache(tmp_path / 'cache', max_size=10_000)
+    scans = []
+    real_scan = cache._scan
+    monkeypatch.setattr(cache, '_scan', lambda: scans.append(1) or real_scan())
+
+    for page in range(100):
+        cache.set(URL, {'page': page}, 'x' * 500)
+
+    total = sum(path.stat().st_size for path in (tmp_path / 'cache').glob('*.json'))
+    assert total <= 10_000
+    # Папка обходится при первой записи и при вытеснении (с запасом 10%), а не при каждой из 100 записей
+    assert len(scans) < 40
+    assert cache.get(URL, {'page': 99}) == 'x' * 500
+
+
+def test_entry_removed_by_another_process_during_eviction(tmp_path, monkeypatch):
+    cache = ResponseCache(tmp_path / 'cache', max_size=2_000)
+    for page in range(3):
+        cache.set(URL, {'page': page}, 'x' * 500)
+
+    # Другой процесс удаляет запись между обходом папки и stat()
+    real_glob = type(cache.directory).glob
+
+    def glob(self, pattern):
+        paths = list(real_glob(self, pattern))
+        paths[0].unlink()
+        return iter(paths)
+
+    monkeypatch.setattr(type(cache.directory), 'glob', glob)
+    for page in range(3, 10):
+        cache.set(URL, {'page': page}, 'x' * 500)
+
+
+def test_io_errors_are_misses_not_failures(tmp_path):
+    cache = ResponseCache(tmp_path / 'cache')
+    cache.set(URL, {'page': 1}, 'body')
+    shutil.rmtree(tmp_path / 'cache')
+
+    assert cache.get(URL, {'page': 1}) is None
+    cache.set(URL, {'page': 2}, 'body')
@@ -0,0 +1,57 @@
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+from cookie_store import CookieStore
+
+
+def _dead_pid() -> int:
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return process.pid
+
+
+def test_live_lock_is_not_removed(tmp_path):
+    store = CookieStore(tmp_path / 'user.cookies.json', lock_timeout=0.3, stale_lock=0.2, poll_interval=0.05)
+    holder = CookieStore(store.path, stale_lock=0.2)
+
+    async def scenario():
+        async with holder.lock():
+            token = store.lock_path.read_text()
+            # Замок держится дольше stale_lock и lock_timeout ожидающего
+            async with store.lock():
+                assert store.lock_path.read_text() == token
+            await asyncio.sleep(0.2)
+            assert store.lock_path.read_text() == token
+        assert not store.lock_path.exists()
+
+    asyncio.run(scenario())
+
+
+def test_lock_of_dead_process_is_removed(tmp_path):
+    store = CookieStore(tmp_path / 'user.cookies.json', lock_timeout=5, poll_interval=0.05)
+    store.lock_path.write_text(f'{socket.gethostname()} {_dead_pid()} abc')
+
+    async def scenario():
+        started = time.monotonic()
+        async with store.lock():
+            assert 'abc' not in store.lock_path.read_text()
+        return time.monotonic() - started
+
+    if os.name == 'posix':
+        assert asyncio.run(scenario()) < 1
+
+
+def test_release_keeps_foreign_lock(tmp_path):
+    store = CookieStore(tmp_path / 'user.cookies.json')
+
+    async def scenario():
+        async with store.lock():
+            # Замок отобрали как устаревший и занял другой процесс
+            store.lock_path.write_text('other-host 1 other')
+        assert store.lock_path.read_text() == 'other-host 1 other'
+
+    asyncio.run(scenario())
@@ -0,0 +1,57 @@
+import json
+from pathlib import Path
+
+import pandas as pd
+
+from data_processing import build_tables
+
+EXPECTED = Path(__file__).resolve().parents[1] / 'benchmarks' / 'fixtures' / 'expected.json'
+
+
+def _corpus_records() -> list[dict]:
+    # Записи обезличенного корпуса benchmarks/fixtures, среди них ученик без VK ID (04_no_vk)
+    return list(json.loads(EXPECTED.read_text(encoding='utf-8'))['detail'].values())
+
+
+def test_pivot_keeps_student_without_vk_id():
+    records = _corpus_records()
+    no_vk = [record for record in records if record['vk_id'] is None]
+    assert no_vk
+
+    _, table = build_tables(records)
+    assert table is not None
+    emails = set(table['user_email'])
+    assert {record['user_email'] for record in records if record['level']} <= emails
+    row = table[table['user_email'] == no_vk[0]['user_email']]
+    assert pd.isna(row['vk_id'].iloc[0])
+
+
+def test_empty_run_gives_empty_analytics(tmp_path, monkeypatch, capsys):
+    from data_processing import build_analytics_tables, process_and_save_data
+
+    df, _ = build_tables([])
+    tables = build_analytics_tables(df)
+    assert set(tables) == {'Students', 'Lessons', 'Lateness', 'Scores'}
+    assert all(table.empty for table in tables.values())
+
+    monkeypatch.chdir(tmp_path)
+    process_and_save_data([], 'empty.xlsx', analytics=True)
+    assert '[ERROR]' not in capsys.readouterr().out
+
+
+def test_analytics_keep_same_named_lessons_of_different_modules_apart():
+    from data_processing import build_analytics_tables
+
+    records = _corpus_records()
+    lessons = {(record['course'], record['module'], record['lesson']) for record in records}
+    # В корпусе "Урок №15. Оптика" есть и в 1, и во 2 блоке
+    assert len(lessons) > len({record['lesson'] for record in records})
+
+    df, _ = build_tables(records)
+    tables = build_analytics_tables(df)
+    students = tables['Students']
+    for record in records:
+        row = students[students['user_email'] == record['user_email']]
+        assert row[record['level']].iloc[0] == 1 / len(lessons)
+    assert len(tables['Scores']) == len({(record['course'], record['module'], record['lesson'], record['level'])
+                                         for record in records})
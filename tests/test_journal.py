@@ -0,0 +1,69 @@
+from journal import ScrapeJournal
+
+PARAMS = {'status': 'passed', 'course_id': 1, 'group_id': 1, 'module_id': 2}
+ROWS_1 = [('https://x/view/1', 'a'), ('https://x/view/2', 'b')]
+ROWS_2 = [('https://x/view/3', 'c')]
+
+
+def _write(path):
+    journal = ScrapeJournal(path)
+    journal.start(PARAMS)
+    journal.page(1, ROWS_1)
+    journal.page(2, ROWS_2)
+    journal.record({'href': 'https://x/view/1', 'name': 'Ученик 1'})
+    journal.close()
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    _write(path)
+
+    journal = ScrapeJournal(path)
+    assert journal.load()
+    assert journal.params == PARAMS
+    assert journal.pages == {1: ROWS_1, 2: ROWS_2}
+    assert journal.records == {'https://x/view/1': {'href': 'https://x/view/1', 'name': 'Ученик 1'}}
+    assert journal.pending_rows() == [ROWS_1[1], ROWS_2[0]]
+
+
+def test_truncated_last_line_is_ignored(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    _write(path)
+    # Обрыв посреди записи при аварийном завершении
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"type": "record", "record": {"href": "https://x/vi')
+
+    journal = ScrapeJournal(path)
+    assert journal.load()
+    assert list(journal.records) == ['https://x/view/1']
+    assert len(journal.pending_rows()) == 2
+
+
+def test_resume_appends_and_finish_removes(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    _write(path)
+
+    journal = ScrapeJournal(path)
+    journal.load()
+    journal.start(journal.params, resume=True)
+    for url, _ in journal.pending_rows():
+        journal.record({'href': url})
+    journal.close()
+
+    resumed = ScrapeJournal(path)
+    assert resumed.load()
+    assert resumed.params == PARAMS
+    assert resumed.pending_rows() == []
+
+    resumed.finish()
+    assert not path.exists()
+    assert not ScrapeJournal(path).load()
+
+
+def test_disabled_journal(tmp_path):
+    journal = ScrapeJournal(None)
+    journal.start(PARAMS)
+    journal.page(1, ROWS_1)
+    journal.finish()
+    assert not journal.load()
+    assert list(tmp_path.iterdir()) == []
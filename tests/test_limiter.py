@@ -0,0 +1,41 @@
+import asyncio
+import random
+import time
+
+from limiter import AdaptiveLimiter
+
+
+async def _drive(limiter, capacity, service, jitter, seconds=2.0, workers=150):
+    # Сервер, который одновременно обслуживает не больше capacity запросов (0 -- без ограничения)
+    server = asyncio.Semaphore(capacity) if capacity else None
+    rng = random.Random(0)
+    stop = time.monotonic() + seconds
+
+    async def request():
+        delay = service + rng.random() * jitter
+        if server is None:
+            await asyncio.sleep(delay)
+            return
+        async with server:
+            await asyncio.sleep(delay)
+
+    async def worker():
+        while time.monotonic() < stop:
+            async with limiter.slot():
+                await request()
+
+    await asyncio.gather(*(worker() for _ in range(workers)))
+
+
+def test_backs_off_when_server_saturates():
+    limiter = AdaptiveLimiter(initial_limit=10, max_limit=150)
+    asyncio.run(_drive(limiter, capacity=10, service=0.01, jitter=0.0))
+    # Без роста базы вместе с нагрузкой лимит уходил к 80+, а задержка -- в 8 раз выше ненагруженной
+    assert limiter.limit < 40
+    assert limiter.base_latency < 0.02
+
+
+def test_grows_on_jittery_unsaturated_server():
+    limiter = AdaptiveLimiter(initial_limit=10, max_limit=150)
+    asyncio.run(_drive(limiter, capacity=0, service=0.01, jitter=0.05))
+    assert limiter.limit > 40
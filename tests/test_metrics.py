@@ -0,0 +1,42 @@
+from metrics import ScrapeMetrics
+from retry import RetryPolicy
+
+
+def _sample(text: str, name: str) -> str:
+    return next(line for line in text.splitlines() if line.startswith(name + ' ') or line.startswith(name + '{'))
+
+
+def test_large_counters_exported_exactly():
+    metrics = ScrapeMetrics()
+    metrics.inc('response_bytes_total', 123456789, endpoint='/student_homework/view/{id}')
+    metrics.observe('body_seconds', 0.1234567)
+    text = metrics.to_prometheus()
+    assert _sample(text, 'scraper_response_bytes_total').endswith(' 123456789')
+    assert _sample(text, 'scraper_body_seconds_sum').endswith(' 0.1234567')
+
+
+def test_label_values_escaped():
+    metrics = ScrapeMetrics()
+    metrics.inc('requests_total', endpoint='a"b\\c\nd', status=200)
+    line = _sample(metrics.to_prometheus(), 'scraper_requests_total')
+    assert 'endpoint="a\\"b\\\\c\\nd"' in line
+
+
+async def _fail():
+    raise ValueError('not retryable')
+
+
+def test_retries_exported_as_monotonic_counters():
+    import asyncio
+
+    metrics = ScrapeMetrics()
+    for _ in range(2):
+        # В режиме демона политика повторов создается заново на каждый сбор
+        policy = RetryPolicy(metrics=metrics)
+        try:
+            asyncio.run(policy.run('https://example.com', _fail))
+        except ValueError:
+            pass
+    text = metrics.to_prometheus()
+    assert '# TYPE scraper_failed_attempts_total counter' in text
+    assert _sample(text, 'scraper_failed_attempts_total').endswith(' 2')
@@ -0,0 +1,70 @@
+import asyncio
+
+from pagination import PREFETCH_PAGES, PageCursor
+
+PER_PAGE = 15
+
+
+def crawl(pages, workers=3, with_info=True, failed=(), done_pages=()):
+    # pages -- число записей на каждой странице списка; возвращает запрошенные страницы и курсор
+    total = sum(pages)
+    requested = []
+
+    async def worker(cursor):
+        while True:
+            page_number = await cursor.take()
+            if page_number is None:
+                return
+            requested.append(page_number)
+            await asyncio.sleep(0)
+            if page_number in failed:
+                await cursor.done(page_number, None, None)
+                continue
+            count = pages[page_number - 1] if page_number <= len(pages) else 0
+            rows = [('url', 'hash')] * count
+            first = (page_number - 1) * PER_PAGE + 1
+            info = (first, first + count - 1, total) if with_info and count else None
+            await cursor.done(page_number, rows, info)
+
+    async def run():
+        cursor = PageCursor(done_pages)
+        await asyncio.gather(*(worker(cursor) for _ in range(workers)))
+        return cursor
+
+    cursor = asyncio.run(run())
+    return sorted(requested), cursor
+
+
+def test_counter_defines_pages():
+    requested, cursor = crawl([15, 15, 15, 5])
+    assert requested == [1, 2, 3, 4]
+    assert cursor.pages_count == 4
+    assert cursor.total == 50
+
+
+def test_without_counter_pages_are_probed_until_empty():
+    requested, cursor = crawl([15, 15, 7], with_info=False)
+    # Каждая непустая страница открывает PREFETCH_PAGES следующих, первая пустая обрезает список
+    assert requested[:4] == [1, 2, 3, 4]
+    assert max(requested) <= 3 + PREFETCH_PAGES
+    assert cursor.pages_count == 3
+    assert cursor.exhausted
+
+
+def test_empty_page_cuts_the_list():
+    # Счетчик обещает 4 страницы, но третья уже пуста: записи удалили во время сбора
+    requested, cursor = crawl([15, 15, 0, 15], workers=1)
+    assert requested == [1, 2, 3]
+    assert cursor.pages_count == 2
+
+
+def test_failed_first_page_ends_the_list():
+    requested, cursor = crawl([15, 15], failed={1})
+    assert requested == [1]
+    assert cursor.pages_count == 1
+    assert not cursor.exhausted
+
+
+def test_done_pages_are_skipped_except_first():
+    requested, _ = crawl([15, 15, 15, 15], done_pages={1, 2, 4})
+    assert requested == [1, 3]
@@ -0,0 +1,25 @@
+import pytest
+
+from check_startup import HEAVY_MODULES, measure, top_level_ms
+
+# Бюджеты check_startup.py с запасом: на общих CI-машинах импорт заметно медленнее и шумнее
+HELP_BUDGET_MS = 3 * 100
+SCRAPE_BUDGET_MS = 3 * 600
+
+
+@pytest.fixture(scope='module')
+def baseline_ms():
+    _, modules = measure(['-c', 'pass'], 3)
+    return top_level_ms(modules)
+
+
+@pytest.mark.parametrize('args, budget_ms', [
+    (['__main__.py', '--help'], HELP_BUDGET_MS),
+    (['-c', 'import web_scraper'], SCRAPE_BUDGET_MS),
+])
+def test_startup_skips_heavy_modules(args, budget_ms, baseline_ms):
+    _, modules = measure(args, 3)
+    assert modules, 'python -X importtime ничего не вывел'
+    loaded = {module.split('.')[0] for module in modules}
+    assert not loaded & set(HEAVY_MODULES)
+    assert top_level_ms(modules) - baseline_ms < budget_ms
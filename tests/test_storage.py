@@ -0,0 +1,35 @@
+import sqlite3
+
+from storage import HomeworkStore
+
+
+def _record(number: int) -> dict:
+    return {'href': f'https://api.100points.ru/student_homework/view/{number}', 'user_email': 'a@example.com'}
+
+
+def test_saved_rows_visible_before_close(tmp_path):
+    path = tmp_path / 'homeworks.sqlite'
+    store = HomeworkStore(str(path), commit_every=2)
+    for number in range(3):
+        store.save(_record(number), row_hash=str(number))
+    store.touch([])
+
+    # Другое соединение видит записи, пока хранилище еще открыто
+    other = sqlite3.connect(path)
+    assert other.execute('SELECT COUNT(*) FROM homeworks').fetchone()[0] == 3
+    other.execute('UPDATE homeworks SET last_seen = last_seen')
+    other.commit()
+    other.close()
+    store.close()
+
+
+def test_batch_committed_without_close(tmp_path):
+    path = tmp_path / 'homeworks.sqlite'
+    store = HomeworkStore(str(path), commit_every=2)
+    for number in range(2):
+        store.save(_record(number))
+
+    other = sqlite3.connect(path)
+    assert other.execute('SELECT COUNT(*) FROM homeworks').fetchone()[0] == 2
+    other.close()
+    store.close()
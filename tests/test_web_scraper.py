@@ -0,0 +1,89 @@
+import asyncio
+import io
+import json
+from types import SimpleNamespace
+
+from aiohttp.test_utils import TestServer
+
+from bench_load import free_port
+from fake_server import FakeServer
+from web_scraper import WebScraper
+
+RECORDS = 90
+
+
+class CountingServer(FakeServer):
+    # Запоминает, какие домашние задания запрашивались
+    def __init__(self, **options):
+        super().__init__(latency=0.005, jitter=0.002, **options)
+        self.views = []
+
+    async def view(self, request):
+        self.views.append(request.match_info['number'])
+        return await super().view(request)
+
+
+class ExpiringServer(CountingServer):
+    # Все сессии один раз сбрасываются посреди сбора, как при истечении cookies на настоящем сервере
+    def __init__(self, expire_after: int, **options):
+        super().__init__(**options)
+        self.expire_after = expire_after
+
+    async def view(self, request):
+        if len(self.views) + 1 == self.expire_after:
+            self.sessions.clear()
+        return await super().view(request)
+
+
+def _number(href: str) -> int:
+    return int(href.partition('?')[0].rsplit('/', 1)[1])
+
+
+async def _scrape(server, monkeypatch, port=None, **options):
+    async with TestServer(server.make_app(), host='localhost', port=port) as test_server:
+        config = SimpleNamespace(email='test@example.com', password='secret', course_id=1, group_id=1,
+                                 show_homeworks_in_the_terminal=False)
+        scraper = WebScraper(config, connections_limit=10, use_cache=False, rate_limits={},
+                             base_url=str(test_server.make_url('')).rstrip('/'), **options)
+        scraper.show_progress = False
+        # Пустой ввод на оба фильтра: все модули и все уроки
+        monkeypatch.setattr('sys.stdin', io.StringIO('\n\n'))
+        await scraper.run_scraping()
+        return scraper
+
+
+def test_resume_fetches_only_missing_records(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    journal_path = tmp_path / 'journal.jsonl'
+    # В журнале абсолютные ссылки, поэтому второй прогон идет на тот же адрес
+    port = free_port()
+    # Первый прогон "прерывается": журнал остается на диске
+    monkeypatch.setattr('journal.ScrapeJournal.finish', lambda journal: journal.close())
+    asyncio.run(_scrape(CountingServer(records=RECORDS), monkeypatch, port, journal_path=journal_path))
+    monkeypatch.undo()
+    monkeypatch.chdir(tmp_path)
+
+    lines = journal_path.read_text(encoding='utf-8').splitlines()
+    kept = [line for line in lines if json.loads(line)['type'] != 'record']
+    records = [line for line in lines if json.loads(line)['type'] == 'record'][:RECORDS // 3]
+    journal_path.write_text('\n'.join(kept + records) + '\n{"type": "record", "rec', encoding='utf-8')
+
+    server = CountingServer(records=RECORDS)
+    scraper = asyncio.run(_scrape(server, monkeypatch, port, journal_path=journal_path, resume=True))
+
+    hrefs = [record.href for record in scraper.data]
+    assert len(hrefs) == len(set(hrefs)) == RECORDS
+    assert len(server.views) == RECORDS - len(records)
+    assert not journal_path.exists()
+
+
+def test_expired_session_logs_in_once_and_replays(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    server = ExpiringServer(expire_after=30, records=RECORDS)
+
+    scraper = asyncio.run(_scrape(server, monkeypatch, journal_path=None))
+
+    # Первый вход и ровно один повторный, хотя сессия истекла у всех запросов в полете
+    assert server.logins == 2
+    assert sorted(_number(record.href) for record in scraper.data) == list(range(RECORDS))
+    assert not scraper.retry_policy.failed_urls